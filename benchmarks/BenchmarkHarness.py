@@ -0,0 +1,105 @@
+"""A minimal harness for timing benchmarks and comparing results across
+commits"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+
+
+def gitRevision(directory: str) -> str:
+    """Returns the current commit of the repository, or "unknown"."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                cwd=directory, capture_output=True, text=True)
+    except OSError:
+        return "unknown"
+    return result.stdout.strip() if result.returncode == 0 else "unknown"
+
+
+class BenchmarkHarness:
+    """Runs benchmark functions several times and keeps the min/median/max
+    time of each. Results are keyed by "<benchmark>[<size>]"."""
+
+    def __init__(self, repeat: int = 5, min_time: float = 0.05) -> None:
+        self.repeat_ = repeat
+        self.min_time_ = min_time
+        self.results_: dict[str, dict] = {}
+
+    def run(self, name: str, size: int, function, setup=None) -> dict:
+        """Times function(data), where data = setup() is created outside the
+        timed region. Each repetition calls function as many times as needed
+        to last at least min_time, and the per-call time is recorded."""
+        data = setup() if setup is not None else None
+
+        # Calibrate the number of calls per repetition
+        number = 1
+        while True:
+            time_start = time.perf_counter()
+            for _ in range(number):
+                function(data)
+            elapsed = time.perf_counter() - time_start
+            if elapsed >= self.min_time_ or number >= 1 << 20:
+                break
+            number *= 2
+
+        times = []
+        for _ in range(self.repeat_):
+            time_start = time.perf_counter()
+            for _ in range(number):
+                function(data)
+            times.append((time.perf_counter() - time_start) / number)
+
+        result = dict(size=size, number=number, repeat=self.repeat_,
+                      min=min(times), median=statistics.median(times),
+                      max=max(times))
+        key = f"{name}[{size}]"
+        self.results_[key] = result
+        print(f"{key:45s} {result['median'] * 1.0e3:12.4f} ms "
+              f"(min {result['min'] * 1.0e3:.4f} ms, {number}x{self.repeat_})")
+        sys.stdout.flush()
+        return result
+
+    def record(self, name: str, size: int, values: dict) -> None:
+        """Stores measurements made outside run, e.g. from a single
+        end-to-end execution."""
+        key = f"{name}[{size}]"
+        self.results_[key] = dict(size=size, **values)
+        print(f"{key:45s} " + ", ".join(f"{k}={v:.6g}" if isinstance(v, float)
+                                        else f"{k}={v}" for k, v in values.items()))
+        sys.stdout.flush()
+
+    def save(self, file_name: str, suite: str, repo_directory: str) -> None:
+        data = dict(suite=suite,
+                    revision=gitRevision(repo_directory),
+                    python=platform.python_version(),
+                    machine=platform.machine(),
+                    timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    results=self.results_)
+        with open(file_name, "w") as file:
+            json.dump(data, file, indent=2)
+        print(f"Results written to {file_name}")
+
+    def compare(self, file_name: str, metric: str = "median") -> None:
+        """Prints the ratio of the current results to those of a previously
+        saved file. Ratios above 1 mean the current revision is slower."""
+        if not os.path.isfile(file_name):
+            raise RuntimeError(f"\033[31mBaseline file \"{file_name}\" not found\033[0m")
+        with open(file_name) as file:
+            baseline = json.load(file)
+
+        print(f"\nComparison with {file_name} "
+              f"(revision {baseline.get('revision', 'unknown')}):")
+        for key, result in self.results_.items():
+            if key not in baseline["results"] or metric not in result:
+                continue
+            old = baseline["results"][key][metric]
+            new = result[metric]
+            if old <= 0.0:
+                continue
+            ratio = new / old
+            color = "\033[31m" if ratio > 1.1 else "\033[32m" if ratio < 0.9 else ""
+            print(f"  {color}{key:45s} {ratio:6.2f}x\033[0m")
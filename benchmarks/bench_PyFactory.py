@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks of tfc_PyFactory: Parameter construction (eager and lazy),
+getParam lookup, bulk array extraction, merge/diff, assignParameters,
+makeObject, readYAML and __str__ serialization.
+
+Example:
+  python3 benchmarks/bench_PyFactory.py --sizes 10 100 1000 -o base.json
+  (change something)
+  python3 benchmarks/bench_PyFactory.py --sizes 10 100 1000 --compare base.json
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+sys.path.append(file_path + "../")
+
+from tfc_PyFactory import *
+from BenchmarkHarness import BenchmarkHarness
+
+
+# ========================================================= Synthetic inputs
+def syntheticBlock(size: int) -> dict:
+    """A block with size entries of mixed types, roughly like a test spec."""
+    block = {}
+    for k in range(size):
+        kind = k % 5
+        if kind == 0:
+            block[f"int_{k}"] = k
+        elif kind == 1:
+            block[f"float_{k}"] = k * 0.5
+        elif kind == 2:
+            block[f"string_{k}"] = f"value {k}"
+        elif kind == 3:
+            block[f"array_{k}"] = [0.1 * i for i in range(8)]
+        else:
+            block[f"block_{k}"] = dict(type="ExitCodeCheck", gold_value=0,
+                                       flags=[True, False])
+    return block
+
+
+class BenchObject(TFCObject):
+    """An object with a configurable number of optional parameters."""
+    num_params_ = 10
+
+    @staticmethod
+    def getInputParameters() -> InputParameters:
+        params = TFCObject.getInputParameters()
+        for k in range(BenchObject.num_params_):
+            params.addOptionalParam(f"option_{k}", k, "A benchmark option")
+        params.addOptionalParam("values", [0.0], "A benchmark array")
+        return params
+
+    def __init__(self, params: InputParameters) -> None:
+        super().__init__(params)
+        self.option_0_ = params.getParam("option_0").getIntegerValue()
+
+
+PyFactory.register(BenchObject, "BenchObject")
+
+
+def objectSpec(num_params: int) -> dict:
+    spec = dict(type="BenchObject", values=[1.0, 2.0, 3.0])
+    for k in range(0, num_params, 2):
+        spec[f"option_{k}"] = -k
+    return spec
+
+
+def writeYAMLFile(directory: str, num_objects: int) -> str:
+    file_name = os.path.join(directory, f"objects_{num_objects}.yaml")
+    with open(file_name, "w") as file:
+        for k in range(num_objects):
+            file.write(f"object_{k}:\n  type: BenchObject\n"
+                       f"  option_0: {k}\n  values: [1.0, 2.0, 3.0]\n")
+    return file_name
+
+
+# ========================================================= Benchmarks
+def runBenchmarks(harness: BenchmarkHarness, sizes: list[int], work_dir: str) -> None:
+    for size in sizes:
+        block = syntheticBlock(size)
+        harness.run("Parameter_from_dict", size,
+                    lambda data: Parameter("", data), lambda: block)
+
+        # A constructor reading a few of the keys of a large spec
+        few_keys = list(block.keys())[:3]
+        harness.run("LazyParameter_from_dict", size,
+                    lambda data: [LazyParameter("", data).getParam(key)
+                                  for key in few_keys], lambda: block)
+
+        values = [float(k) for k in range(size * 10)]
+        harness.run("Parameter_from_list", size * 10,
+                    lambda data: Parameter("", data), lambda: values)
+
+        array_param = Parameter("", values)
+        harness.run("getFloatValue_per_element", size * 10,
+                    lambda data: [sub_param.getFloatValue() for sub_param in data],
+                    lambda: array_param)
+        harness.run("getFloatArray", size * 10,
+                    lambda data: data.getFloatArray(), lambda: array_param)
+        harness.run("LazyParameter_getFloatArray", size * 10,
+                    lambda data: LazyParameter("", data).getFloatArray(),
+                    lambda: values)
+
+        param = Parameter("", block)
+        keys = list(block.keys())
+        # Look up every key, as a constructor reading all its options would
+        harness.run("getParam_all_keys", size,
+                    lambda data: [data.getParam(key) for key in keys],
+                    lambda: param)
+
+        # A template overridden in a few keys, as by a test
+        pool = ParameterPool()
+        template = pool.makeBlock(block).freeze()
+        override = pool.makeBlock({key: 0 for key in keys[:3]}).freeze()
+        harness.run("ParameterMerge_merge", size,
+                    lambda data: ParameterMerge.merge(template, data), lambda: override)
+        harness.run("ParameterMerge_diff", size,
+                    lambda data: ParameterMerge.diff(param, data), lambda: template)
+
+        BenchObject.num_params_ = size
+        PyFactory.clearSchemaCache()
+        spec = objectSpec(size)
+
+        def assign(data):
+            valid_params = BenchObject.getInputParameters()
+            valid_params.assignParameters(data)
+
+        harness.run("assignParameters", size, assign,
+                    lambda: Parameter("", dict(spec, name="bench")))
+
+        harness.run("makeObject", size,
+                    lambda data: PyFactory.makeObject("bench", Parameter("", data)),
+                    lambda: spec)
+
+        BenchObject.num_params_ = 10
+        PyFactory.clearSchemaCache()
+        yaml_file = writeYAMLFile(work_dir, size)
+        harness.run("readYAML", size,
+                    lambda data: PyFactory.readYAML(data), lambda: yaml_file)
+
+        harness.run("Parameter_str", size,
+                    lambda data: str(data), lambda: param)
+
+
+# ========================================================= Main
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmarks of tfc_PyFactory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Input sizes (number of keys/objects) to benchmark")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Number of timed repetitions per benchmark")
+    parser.add_argument("--min_time", type=float, default=0.05,
+                        help="Minimum duration, in seconds, of one repetition")
+    parser.add_argument("-o", "--output", type=str, default="",
+                        help="File to which the results are written as JSON")
+    parser.add_argument("--compare", type=str, default="",
+                        help="JSON results of a previous run to compare against")
+    argv = parser.parse_args()
+
+    harness = BenchmarkHarness(argv.repeat, argv.min_time)
+    with tempfile.TemporaryDirectory() as work_dir:
+        runBenchmarks(harness, argv.sizes, work_dir)
+
+    if argv.output != "":
+        harness.save(argv.output, "PyFactory", file_path)
+    if argv.compare != "":
+        harness.compare(argv.compare)
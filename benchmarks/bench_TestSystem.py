@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the test system's own overhead. Synthetic trees of
+*tests*.yaml files are generated, with a trivial shell script standing in
+for the executable, and run with TFCTestSystem. Reported per tree:
+  discovery     : time to find the test files,
+  parse         : time to parse them and create the tests,
+  run           : wall time of TFCTestSystem.run,
+  overhead/test : slot-seconds not spent in test processes, per test,
+  utilization   : fraction of the slot-seconds spent in test processes.
+
+Example:
+  python3 benchmarks/bench_TestSystem.py --files 10 100 --tests 20 -j 8 -o base.json
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+sys.path.append(file_path + "../")
+sys.path.append(file_path + "../tfc_TestSystem")
+
+from tfc_PyFactory import *
+from tfc_TestSystem import *
+from BenchmarkHarness import BenchmarkHarness
+
+STAND_IN_SCRIPT = """#!/bin/sh
+# Stand-in executable: prints $1 bytes of output and a marker line
+head -c "$1" /dev/zero | tr '\\0' 'x'
+echo
+echo "stand-in done"
+"""
+
+
+# ========================================================= Tree generation
+def testChecks(num_checks: int) -> str:
+    checks = []
+    for k in range(num_checks):
+        if k % 2 == 0:
+            checks.append("{type: ExitCodeCheck, gold_value: 0}")
+        else:
+            checks.append('{type: HasStringCheck, line_key: "stand-in done"}')
+    return "[" + ", ".join(checks) + "]"
+
+
+def generateTree(root: str, num_files: int, num_tests: int, num_checks: int,
+                 num_templates: int, dependency_depth: int,
+                 output_bytes: int) -> int:
+    """Writes num_files test files, in one directory each, and returns the
+    total number of tests. With dependency_depth D, the tests of a file form
+    chains of D+1 tests each depending on the previous one."""
+    stand_in = os.path.join(root, "stand_in.sh")
+    with open(stand_in, "w") as file:
+        file.write(STAND_IN_SCRIPT)
+
+    checks = testChecks(num_checks)
+    for f in range(num_files):
+        directory = os.path.join(root, f"dir_{f:05d}")
+        os.makedirs(directory)
+
+        lines = []
+        for k in range(num_templates):
+            lines += [f"TEMPLATE_{k}:",
+                      "  executable: sh",
+                      f"  checks: {checks}"]
+        for t in range(num_tests):
+            lines.append(f"f{f}_t{t}:")
+            if num_templates > 0:
+                lines.append(f"  from_template: TEMPLATE_{t % num_templates}")
+            else:
+                lines += ["  executable: sh",
+                          f"  checks: {checks}"]
+            lines.append(f'  args: "{stand_in} {output_bytes}"')
+            if dependency_depth > 0 and t % (dependency_depth + 1) != 0:
+                lines.append(f"  dependencies: [f{f}_t{t - 1}]")
+
+        with open(os.path.join(directory, "bench_tests.yaml"), "w") as file:
+            file.write("\n".join(lines) + "\n")
+
+    return num_files * num_tests
+
+
+# ========================================================= Measurement
+class PhaseTimer:
+    """Accumulates the time spent in methods of a class."""
+
+    def __init__(self, cls, method_names: list[str]) -> None:
+        self.cls_ = cls
+        self.times_ = {name: 0.0 for name in method_names}
+        self.originals_ = {}
+        for name in method_names:
+            self.originals_[name] = getattr(cls, name)
+            setattr(cls, name, self._wrap(name))
+
+    def _wrap(self, name: str):
+        original = self.originals_[name]
+
+        def timed(*args, **kwargs):
+            time_start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.times_[name] += time.perf_counter() - time_start
+        return timed
+
+    def restore(self) -> None:
+        for name, original in self.originals_.items():
+            setattr(self.cls_, name, original)
+
+
+def benchmarkTree(root: str, num_jobs: int) -> dict:
+    params = dict(type="TFCTestSystem", directory=root, executable="sh",
+                  num_jobs=num_jobs, weights=7, progress=False)
+
+    timer = PhaseTimer(PyFactory.registered_objects_["TFCTestSystem"],
+                       ["_recursiveFindTestListFiles", "_parseTestFiles"])
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            time_start = time.perf_counter()
+            test_system = PyFactory.makeObject("TFCTestSystem", Parameter("", params))
+            time_created = time.perf_counter()
+            error_code = test_system.run()
+            time_end = time.perf_counter()
+    finally:
+        timer.restore()
+
+    tests = test_system.tests_
+    num_tests = max(1, len(tests))
+    run_time = time_end - time_created
+    busy = sum((test._time_end_ - test._time_start_) * test.num_procs_
+               for test in tests if test.skip_ == "")
+    slot_seconds = run_time * num_jobs
+
+    if error_code != 0:
+        print("\033[31mWARNING: Not all synthetic tests passed\033[0m")
+
+    return dict(tests=len(tests),
+                discovery=timer.times_["_recursiveFindTestListFiles"],
+                parse=timer.times_["_parseTestFiles"],
+                startup=time_created - time_start,
+                run=run_time,
+                overhead_per_test=(slot_seconds - busy) / num_tests,
+                run_per_test=run_time / num_tests,
+                utilization=busy / slot_seconds if slot_seconds > 0.0 else 0.0)
+
+
+# ========================================================= Main
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="End-to-end benchmark of the test system overhead")
+    parser.add_argument("--files", type=int, nargs="+", default=[10, 50],
+                        help="Numbers of test files to benchmark, one tree each")
+    parser.add_argument("--tests", type=int, default=10,
+                        help="Number of tests per file")
+    parser.add_argument("--checks", type=int, default=2,
+                        help="Number of checks per test")
+    parser.add_argument("--templates", type=int, default=1,
+                        help="Number of templates per file (0 = no templates)")
+    parser.add_argument("--dependency_depth", type=int, default=0,
+                        help="Length of the dependency chains within a file, minus one")
+    parser.add_argument("--output_bytes", type=int, default=1000,
+                        help="Bytes of output printed by each test")
+    parser.add_argument("-j", "--num_jobs", type=int, default=4,
+                        help="Number of job slots")
+    parser.add_argument("-o", "--output", type=str, default="",
+                        help="File to which the results are written as JSON")
+    parser.add_argument("--compare", type=str, default="",
+                        help="JSON results of a previous run to compare against")
+    argv = parser.parse_args()
+
+    harness = BenchmarkHarness()
+    for num_files in argv.files:
+        with tempfile.TemporaryDirectory() as root:
+            num_tests = generateTree(root, num_files, argv.tests, argv.checks,
+                                     argv.templates, argv.dependency_depth,
+                                     argv.output_bytes)
+            harness.record("TestSystem", num_tests, benchmarkTree(root, argv.num_jobs))
+
+    if argv.output != "":
+        harness.save(argv.output, "TestSystem", file_path)
+    if argv.compare != "":
+        harness.compare(argv.compare, metric="run")
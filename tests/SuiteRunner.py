@@ -0,0 +1,51 @@
+"""Helpers of the tests that run TestSystemEXE on a small generated suite."""
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import os
+import re
+import sys
+import contextlib
+import subprocess
+import tempfile
+
+TEST_SYSTEM_EXE = file_path + "../tfc_TestSystem/TestSystemEXE.py"
+
+
+@contextlib.contextmanager
+def suiteDirectory(suite: str):
+    """A temporary test directory holding suite (the YAML text of a tests
+    file), removed afterwards."""
+    with tempfile.TemporaryDirectory() as suite_dir:
+        with open(os.path.join(suite_dir, "suite_tests.yaml"), "w") as suite_file:
+            suite_file.write(suite)
+        yield suite_dir
+
+
+class SuiteRun:
+    """Runs TestSystemEXE on a test directory, with progress off, and keeps
+    its output, exit code and process id. The output is echoed."""
+
+    def __init__(self, suite_dir: str, *args, env: dict = None,
+                 expected_code: int = 0, timeout: float = 120.0) -> None:
+        process = subprocess.Popen([sys.executable, TEST_SYSTEM_EXE, "-d", suite_dir,
+                                    "--no_progress"] + list(args),
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, env=env)
+        self.output_, _ = process.communicate(timeout=timeout)
+        self.returncode_ = process.returncode
+        self.pid_ = process.pid
+        print(self.output_)
+
+        if expected_code is not None:
+            assert self.returncode_ == expected_code, \
+                f"exit code {self.returncode_}, expected {expected_code}"
+
+    def statusLines(self) -> dict[str, str]:
+        """The status line of each test that was run, by test name."""
+        lines = {}
+        for line in self.output_.splitlines():
+            match = re.search(r"/(\w+)\.\.\.", line)
+            if match is not None:
+                lines[match.group(1)] = line
+        return lines
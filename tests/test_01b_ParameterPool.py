@@ -0,0 +1,75 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path + "../")
+
+from tfc_PyFactory import *
+
+checks = [dict(type="ExitCodeCheck", gold_value=0),
+          dict(type="HasStringCheck", line_key="done")]
+template = dict(executable="sh", checks=checks)
+
+pool = ParameterPool()
+p1 = pool.makeBlock(dict(template.copy(), args="1"))
+p2 = pool.makeBlock(dict(template.copy(), args="2"))
+# Structurally identical, but distinct, values are shared too
+p3 = pool.makeBlock(dict(executable="sh", args="3",
+                         checks=[dict(type="ExitCodeCheck", gold_value=0),
+                                 dict(type="HasStringCheck", line_key="done")]))
+
+assert p1 is not p2
+assert p1.getParam("checks") is p2.getParam("checks")
+assert p1.getParam("checks") is p3.getParam("checks")
+assert p1.getParam("args") is not p2.getParam("args")
+assert str(p1) == str(Parameter("", dict(template, args="1")))
+
+# Parameters, e.g. the results of merges, are interned into the same nodes
+assert pool.intern("checks", Parameter("checks", checks)) is p1.getParam("checks")
+assert pool.intern("checks", p1.getParam("checks").thaw()) is p1.getParam("checks")
+merged = ParameterMerge.merge(p1.getParam("checks"),
+                              Parameter("checks", [dict(gold_value=1)]),
+                              ListMergeStrategy.BY_INDEX)
+interned = pool.intern("checks", merged)
+assert interned is pool.intern("checks", merged.thaw(deep=True))
+assert interned.frozen and interned.getParam(0).getParam("gold_value").getIntegerValue() == 1
+assert interned.getParam(1) is p1.getParam("checks").getParam(1)
+
+# Shared parameters are frozen, copies are not
+check = p1.getParam("checks").getParam(0)
+try:
+    check.addParameter("name", "0")
+    raise AssertionError("a frozen parameter was modified")
+except Exception as ex:
+    assert "frozen" in str(ex)
+
+check_copy = check.copy()
+check_copy.addParameter("name", "0")
+assert len(check.sub_params) == 2
+assert len(check_copy.sub_params) == 3
+
+# The top-level block is modifiable
+p1.addParameter("name", "test_1")
+
+# Frozen parameters hash and compare structurally, others by identity
+a = Parameter("a", dict(x=1, y=[1.0, 2.0]))
+b = Parameter("a", dict(x=1, y=[1.0, 2.0]))
+assert a != b and a == a
+assert len({a, b}) == 2
+frozen_a = a.freeze()
+assert frozen_a == b.freeze() and frozen_a != b
+assert frozen_a is not a and frozen_a.freeze() is frozen_a
+assert hash(frozen_a) == hash(b.freeze())
+assert len({frozen_a: 1, b.freeze(): 2}) == 1
+assert Parameter("a", dict(x=True, y=[1.0, 2.0])).freeze() != frozen_a
+
+# Thawing copies only the top level unless deep
+thawed = frozen_a.thaw()
+thawed.addParameter("z", 3)
+assert thawed.getParam("y") is frozen_a.getParam("y")
+assert len(frozen_a.sub_params) == 2
+deep = frozen_a.thaw(deep=True)
+deep.getParam("y").setValue(5)
+assert str(frozen_a) == str(a)
+
+print("ParameterPool OK")
@@ -0,0 +1,70 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path + "../")
+
+from tfc_PyFactory import *
+
+source = dict(executable="sh", args=["1", "2"], nodes=4, scale=0.5, verbose=True,
+              checks=[dict(type="ExitCodeCheck", gold_value=0)], skip=None)
+param = LazyParameter("test", source)
+
+# Nothing is created until it is accessed, and only what is accessed
+assert param.type == ParameterType.BLOCK
+assert len(param._children_) == 0
+assert param.getParam("nodes").getIntegerValue() == 4
+assert list(param._children_.keys()) == ["nodes"]
+assert param.getParam("nodes") is param.getParam("nodes")
+
+args = param.getParam("args")
+assert args.type == ParameterType.ARRAY
+assert args.getParam(1).getStringValue() == "2"
+assert args.getParam(-1) is args.getParam(1)
+assert param.getParam("checks").getParam(0).getParam("gold_value").getIntegerValue() == 0
+
+try:
+    param.getParam("missing")
+    raise AssertionError("a missing key was found")
+except Exception as ex:
+    assert "missing" in str(ex)
+
+# It is indistinguishable from an eager Parameter
+eager = Parameter("test", source)
+assert str(param) == str(eager)
+assert param.freeze() == eager.freeze()
+assert [p.name for p in param] == list(source.keys())
+assert hash(param.freeze()) == hash(eager.freeze())
+assert param.getParam("skip").type == ParameterType.NO_VALUE
+
+# Parameters created before the level was iterated are kept
+assert param.getParam("args") is args
+
+# The source is never modified
+param.addParameter("name", "test")
+param.getParam("nodes").setValue(8)
+assert "name" not in source and source["nodes"] == 4
+assert param.getParam("name").getStringValue() == "test"
+
+# The factory validates and assigns a lazy spec without expanding it
+class LazyObject(TFCObject):
+    @staticmethod
+    def getInputParameters() -> InputParameters:
+        params = TFCObject.getInputParameters()
+        params.addOptionalParam("data", {}, "Some data")
+        return params
+
+    def __init__(self, params: InputParameters) -> None:
+        super().__init__(params)
+        self.data_ = params.getParam("data")
+
+
+PyFactory.register(LazyObject, "LazyObject")
+spec = LazyParameter("", dict(type="LazyObject",
+                              data={f"key_{k}": dict(value=k) for k in range(100)}))
+obj = PyFactory.makeObjects(dict(lazy=spec))["lazy"]
+assert obj.data_ is spec.getParam("data")
+assert obj.data_._sub_params_ is None and len(obj.data_._children_) == 0
+assert obj.data_.getParam("key_7").getParam("value").getIntegerValue() == 7
+
+print("LazyParameter OK")
@@ -0,0 +1,59 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path + "../")
+
+from tfc_PyFactory import *
+
+import array
+
+gold = [0.5 * k for k in range(100)]
+param = Parameter("gold", gold)
+
+values = param.getFloatArray()
+assert isinstance(values, array.array) and values.typecode == "d"
+assert values.tolist() == gold
+
+# Integers are accepted as floats, and floats truncated to integers, as by the
+# per-element getters
+assert Parameter("x", [1, 2.0, 3]).getFloatArray().tolist() == [1.0, 2.0, 3.0]
+assert Parameter("x", [1, 2.7]).getIntegerArray().tolist() == [1, 2]
+assert Parameter("x", []).getFloatArray().tolist() == []
+assert Parameter("x", ["a", "b"]).getStringList() == ["a", "b"]
+
+
+def expectError(function, text):
+    try:
+        function()
+        raise AssertionError(f'no error containing "{text}"')
+    except Exception as ex:
+        assert text in str(ex), str(ex)
+
+
+expectError(lambda: Parameter("x", 1.0).getFloatArray(), "to float array")
+expectError(lambda: Parameter("x", [1.0, "a"]).getFloatArray(), "to float")
+expectError(lambda: Parameter("x", [[1.0]]).getIntegerArray(), "to int")
+expectError(lambda: Parameter("x", ["a", 1]).getStringList(), "to str")
+
+# The array is a copy
+values[0] = 99.0
+assert param.getParam(0).getFloatValue() == 0.0
+
+# Frozen (e.g. shared) parameters keep their packed array
+frozen = param.freeze()
+assert frozen.getFloatArray() == array.array("d", gold)
+assert frozen._array_ is not None
+assert frozen.getIntegerArray().tolist() == [int(v) for v in gold]
+
+# A lazy array is read without creating its sub-parameters
+lazy = LazyParameter("gold", gold)
+assert lazy.getFloatArray().tolist() == gold
+assert lazy._sub_params_ is None and len(lazy._children_) == 0
+
+# ...unless an element may have been modified
+lazy.getParam(1).setValue(-1.0)
+assert lazy.getFloatArray()[1] == -1.0
+assert gold[1] == 0.5
+
+print("ParameterArrays OK")
@@ -0,0 +1,63 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path + "../")
+
+from tfc_PyFactory import *
+
+pool = ParameterPool()
+base = pool.makeBlock(dict(executable="sh", nodes=4,
+                           mesh=dict(size=1.0, order=2, dims=[10, 10]),
+                           checks=[dict(type="ExitCodeCheck", gold_value=0),
+                                   dict(type="HasStringCheck", line_key="done")])).freeze()
+
+# Blocks are merged key by key; unchanged sub-trees are shared
+override = pool.makeBlock(dict(nodes=8, mesh=dict(order=3), debug=True)).freeze()
+merged = ParameterMerge.merge(base, override)
+assert merged.frozen
+assert str(merged) == str(Parameter("", dict(executable="sh", nodes=8,
+                                             mesh=dict(size=1.0, order=3, dims=[10, 10]),
+                                             checks=[dict(type="ExitCodeCheck", gold_value=0),
+                                                     dict(type="HasStringCheck",
+                                                          line_key="done")],
+                                             debug=True)))
+assert merged.getParam("checks") is base.getParam("checks")
+assert merged.getParam("mesh").getParam("dims") is base.getParam("mesh").getParam("dims")
+assert ParameterMerge.merge(base, pool.makeBlock(dict(nodes=4)).freeze()) is base
+
+# List strategies
+checks = pool.makeBlock(dict(checks=[dict(gold_value=1)])).freeze()
+replaced = ParameterMerge.merge(base, checks)
+assert len(replaced.getParam("checks").sub_params) == 1
+
+by_index = ParameterMerge.merge(base, checks, ListMergeStrategy.BY_INDEX)
+merged_checks = by_index.getParam("checks")
+assert merged_checks.getParam(0).getParam("type").getStringValue() == "ExitCodeCheck"
+assert merged_checks.getParam(0).getParam("gold_value").getIntegerValue() == 1
+assert merged_checks.getParam(1) is base.getParam("checks").getParam(1)
+
+appended = ParameterMerge.merge(base, checks,
+                                list_strategies={"checks": ListMergeStrategy.APPEND})
+assert [p.name for p in appended.getParam("checks")] == ["0", "1", "2"]
+
+# The changes made by a merge, collected in the same traversal, are its diff
+changes = []
+merged = ParameterMerge.merge(base, override, changes=changes)
+diff = ParameterMerge.diff(base, merged)
+assert [c[0] for c in changes] == ["nodes", "mesh.order", "debug"]
+assert changes == diff
+assert changes[2][1] is None and changes[2][2].getBooleanValue()
+
+diff = ParameterMerge.diff(merged, base)
+assert [(c[0], c[2] is None) for c in diff] == [("nodes", False), ("mesh.order", False),
+                                                ("debug", True)]
+assert ParameterMerge.diff(base, base) == []
+assert [c[0] for c in ParameterMerge.diff(base, by_index)] == ["checks[0].gold_value"]
+
+# Merged trees convert back to plain values
+assert by_index.getParam("checks").getPythonValue() == \
+       [dict(type="ExitCodeCheck", gold_value=1),
+        dict(type="HasStringCheck", line_key="done")]
+
+print("ParameterMerge OK")
@@ -0,0 +1,87 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path + "../")
+
+from tfc_PyFactory import *
+
+
+class TestObject(TFCObject):
+    @staticmethod
+    def getInputParameters() -> InputParameters:
+        params = TFCObject.getInputParameters()
+        params.addRequiredParam(
+            "option", ParameterType.INTEGER, "A simple test option")
+        params.addOptionalParam("option2", 2, "Another simple option")
+        params.addOptionalParam("values", [1, 2], "An array option")
+        params.addOptionalParam("block", dict(x=1), "A block option")
+
+        return params
+
+    def __init__(self, params: InputParameters) -> None:
+        super().__init__(params)
+
+        self.option_ = params.getParam('option').getIntegerValue()
+        self.option2_ = params.getParam('option2').getIntegerValue()
+        self.values_ = params.getParam('values')
+        self.block_ = params.getParam('block')
+
+PyFactory.register(TestObject, "TestObject")
+
+# readYAML returns the objects by name
+objects = PyFactory.readYAML(file_path + "test_02b.yaml")
+assert list(objects.keys()) == ["doc_generator"]
+assert objects["doc_generator"].option_ == 1
+
+# Objects are returned in the order of the specs and do not share parameters
+objects = PyFactory.makeObjects([("b", dict(type="TestObject", option=1)),
+                                 ("a", dict(type="TestObject", option=2, option2=5))])
+assert list(objects.keys()) == ["b", "a"]
+assert objects["b"].option2_ == 2
+assert objects["a"].option2_ == 5
+objects["b"].values_.getParam(0).setValue(7)
+objects["b"].block_.getParam("x").setValue(7)
+assert list(objects["a"].values_.getIntegerArray()) == [1, 2]
+assert objects["a"].block_.getParam("x").getIntegerValue() == 1
+
+# All errors are collected
+errors = []
+objects = PyFactory.makeObjects(dict(ok=dict(type="TestObject", option=3),
+                                     bad_type=dict(type="TestObject", option="3"),
+                                     missing=dict(type="TestObject"),
+                                     unknown=dict(type="NotAnObject")), errors)
+print("\n".join(errors))
+assert list(objects.keys()) == ["ok"]
+assert len(errors) == 3
+
+try:
+    PyFactory.makeObjects(dict(missing=dict(type="TestObject")))
+    raise AssertionError("makeObjects did not raise")
+except RuntimeError as ex:
+    assert "Required parameter" in str(ex)
+
+# Also while profiling, all the specs are validated before any object is made:
+# the error of the invalid spec is known when the first object is made. The
+# statistics count each object made.
+class RecordingObject(TestObject):
+    def __init__(self, params: InputParameters) -> None:
+        super().__init__(params)
+        self.num_errors_ = len(errors)
+
+PyFactory.register(RecordingObject, "RecordingObject")
+
+PyFactory.enableProfiling()
+errors = []
+objects = PyFactory.makeObjects([("first", dict(type="RecordingObject", option=1)),
+                                 ("invalid", dict(type="RecordingObject", option="1")),
+                                 ("second", dict(type="RecordingObject", option=2))],
+                                errors)
+PyFactory.disableProfiling()
+assert list(objects.keys()) == ["first", "second"]
+assert len(errors) == 1 and 'Assigning parameters for object "invalid"' in errors[0]
+assert objects["first"].num_errors_ == 1
+stats = PyFactory.profile_stats_["RecordingObject"]
+assert stats["count"] == 3 and stats["constructor"] > 0.0
+
+print("makeObjects OK")
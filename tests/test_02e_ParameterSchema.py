@@ -0,0 +1,73 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path + "../")
+
+from tfc_PyFactory import *
+
+
+def pointParameters() -> InputParameters:
+    params = InputParameters()
+    params.addRequiredParam("x", ParameterType.FLOAT, "The x-coordinate")
+    params.addOptionalParam("weight", 1.0, "The weight of the point",
+                            [InputParameterTag("range", (0.0, None))])
+    return params
+
+
+class TestObject(TFCObject):
+    @staticmethod
+    def getInputParameters() -> InputParameters:
+        params = TFCObject.getInputParameters()
+        params.addOptionalParam("weight_class", "short", "The weight class",
+                                [InputParameterTag("enum", ["short", "long"])])
+        params.addOptionalParam("num_procs", 1, "The number of processes",
+                                [InputParameterTag("range", (1, 8))])
+        params.addOptionalParam("names", [""], "Some names",
+                                [InputParameterTag("element_type", ParameterType.STRING)])
+        params.addOptionalParam("points", [], "Some points",
+                                [InputParameterTag("element_type", ParameterType.BLOCK),
+                                 InputParameterTag("schema", pointParameters())])
+
+        return params
+
+    def __init__(self, params: InputParameters) -> None:
+        super().__init__(params)
+
+PyFactory.register(TestObject, "TestObject")
+
+good = dict(type="TestObject", weight_class="long", num_procs=8,
+            names=["a", "b"], points=[dict(x=1.0), dict(x=2.0, weight=0.5)])
+objects = PyFactory.makeObjects(dict(good=good))
+assert list(objects.keys()) == ["good"]
+
+bad = dict(type="TestObject", weight_class="medium", num_procs=9,
+           names=["a", 2], points=[dict(x=1.0, weight=-1.0), dict(y=2.0)])
+errors = PyFactory.getSchema(TestObject, TestObject.getInputParameters()).validate(
+    Parameter("", dict(bad, name="bad")))
+print("\n".join(errors))
+assert len(errors) == 6
+assert 'points[0].weight' in errors[3]
+assert 'points[1].y' in errors[4]
+assert 'points[1].x' in errors[5]
+
+# The errors of identical frozen (e.g. interned) blocks are cached, whatever
+# the names of the objects
+schema = PyFactory.getSchema(TestObject, None)
+schema.cache_.clear()
+pool = ParameterPool()
+for name in ["bad1", "bad2"]:
+    block = pool.makeBlock(bad)
+    block.addParameter("name", name)
+    assert schema.validate(block) == errors
+assert len(schema.cache_) == 1
+
+# Blocks that are not frozen are not
+try:
+    PyFactory.makeObject("bad", Parameter("", bad))
+    raise AssertionError("makeObject did not raise")
+except RuntimeError as ex:
+    assert "not one of" in str(ex)
+assert len(schema.cache_) == 1
+
+print("ParameterSchema OK")
@@ -0,0 +1,36 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path)
+
+import os
+
+from SuiteRunner import suiteDirectory, SuiteRun
+
+# A test whose prerun script times out never launches, but its output file is
+# still written (into an out directory that does not exist yet)
+suite = '''
+slow_prerun:
+  args: "-c 'echo hi'"
+  executable: sh
+  prerun_script: "sleep 5"
+  timeout: 1
+  checks: [{type: ExitCodeCheck, gold_value: 0}]
+integer_timeout:
+  args: "-c 'echo hi'"
+  executable: sh
+  timeout: 30
+  checks: [{type: ExitCodeCheck, gold_value: 0}]
+'''
+
+with suiteDirectory(suite) as suite_dir:
+    run = SuiteRun(suite_dir, expected_code=None)
+
+    assert "Traceback" not in run.output_
+    assert "Number of tests run     : 2" in run.output_
+    assert "Number of failed tests  : 1" in run.output_
+    assert "[timeout]" in run.statusLines()["slow_prerun"]
+    assert os.path.isfile(os.path.join(suite_dir, "out", "slow_prerun.cout"))
+
+print("PrerunTimeout OK")
@@ -0,0 +1,45 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path)
+
+import os
+import json
+
+from SuiteRunner import suiteDirectory, SuiteRun
+
+suite = ""
+for k, duration in enumerate([0.0, 0.3, 0.6]):
+    suite += f'''
+test_{k}:
+  args: "-c 'sleep {duration}'"
+  executable: sh
+  checks: [{{type: ExitCodeCheck, gold_value: 0}}]
+'''
+
+
+with suiteDirectory(suite) as suite_dir:
+    # Shards run one after the other must partition the tests, without and
+    # with a history
+    for attempt in range(2):
+        shard_1 = set(SuiteRun(suite_dir, "--shard", "1/2").statusLines())
+        shard_2 = set(SuiteRun(suite_dir, "--shard", "2/2").statusLines())
+        assert len(shard_1 & shard_2) == 0
+        assert shard_1 | shard_2 == {"test_0", "test_1", "test_2"}
+        SuiteRun(suite_dir)
+
+    # The history is kept in the given file, which shard runs do not update
+    history_file_name = os.path.join(suite_dir, "history.json")
+    SuiteRun(suite_dir, "--shard", "1/2", "--history_file", history_file_name)
+    assert not os.path.exists(history_file_name)
+    SuiteRun(suite_dir, "--history_file", history_file_name)
+    with open(history_file_name) as history_file:
+        assert set(json.load(history_file)) == {"test_0", "test_1", "test_2"}
+
+    # A history that cannot be written does not fail the run
+    run = SuiteRun(suite_dir, "--history_file",
+                   os.path.join(suite_dir, "suite_tests.yaml", "history.json"))
+    assert "WARNING: Could not save the test history" in run.output_
+
+print("Shards OK")
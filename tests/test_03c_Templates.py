@@ -0,0 +1,40 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path)
+
+import os
+
+from SuiteRunner import suiteDirectory, SuiteRun
+
+# Template-of-template inheritance, with merged arrays, including the ones
+# the test system reads itself (env_var_skip)
+suite = '''
+TEMPLATE_BASE:
+  args: "-c 'echo done 1.5'"
+  executable: sh
+  env_var_skip: ["TFC_TEMPLATE_TEST", "0"]
+  checks: [{type: ExitCodeCheck, gold_value: 0}, {type: HasStringCheck, line_key: "no"}]
+TEMPLATE_DERIVED:
+  from_template: TEMPLATE_BASE
+  list_merge: by_index
+  checks: [{}, {line_key: "done 1.5"}]
+derived:
+  from_template: TEMPLATE_DERIVED
+skipped:
+  from_template: TEMPLATE_DERIVED
+  list_merge: by_index
+  env_var_skip: ["TFC_TEMPLATE_TEST", "1"]
+'''
+
+with suiteDirectory(suite) as suite_dir:
+    run = SuiteRun(suite_dir, env=dict(os.environ, TFC_TEMPLATE_TEST="1"))
+
+    assert "WARNING" not in run.output_
+    assert "Number of tests run     : 2" in run.output_
+    assert "Number of failed tests  : 0" in run.output_
+    assert "Number of tests skipped : 1" in run.output_
+    assert "skipped:TFC_TEMPLATE_TEST==1" in run.statusLines()["skipped"]
+
+print("Templates OK")
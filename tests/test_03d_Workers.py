@@ -0,0 +1,56 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path)
+
+import os
+import json
+
+from SuiteRunner import suiteDirectory, SuiteRun
+
+# A small suite run through two local workers: passing and failing checks,
+# exit codes, a dependency, and the process that ran each command
+suite = '''
+echo_test:
+  args: "-c 'echo parent $PPID'"
+  executable: sh
+  checks: [{type: HasStringCheck, line_key: "parent"}]
+exit_code:
+  args: "-c 'exit 3'"
+  executable: sh
+  checks: [{type: ExitCodeCheck, gold_value: 3}]
+dependent:
+  args: "-c 'echo after'"
+  executable: sh
+  dependencies: ["echo_test"]
+  checks: [{type: HasStringCheck, line_key: "after"}]
+failing:
+  args: "-c 'echo nope'"
+  executable: sh
+  checks: [{type: HasStringCheck, line_key: "missing"}]
+'''
+
+with suiteDirectory(suite) as suite_dir:
+    report = os.path.join(suite_dir, "report.jsonl")
+    run = SuiteRun(suite_dir, "-j", "2", "--local_workers", "2", "--json_report", report,
+                   expected_code=1)
+
+    assert "Started 2 workers with 2 slots in total" in run.output_
+    assert "Number of tests run     : 4" in run.output_
+    assert "Number of failed tests  : 1" in run.output_
+
+    with open(report) as report_file:
+        records = {record["name"]: record
+                   for record in map(json.loads, report_file)}
+    assert {name: record["status"] for name, record in records.items()} == \
+           dict(echo_test="passed", exit_code="passed", dependent="passed",
+                failing="failed")
+    assert records["exit_code"]["exit_code"] == 3
+
+    # The commands ran in the workers, not in the coordinator
+    with open(os.path.join(suite_dir, "out", "echo_test.cout")) as out_file:
+        parent = int(out_file.read().split("parent ")[-1].split()[0])
+    assert parent != run.pid_
+
+print("Workers OK")
@@ -0,0 +1,67 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path)
+
+import os
+
+from SuiteRunner import suiteDirectory, SuiteRun
+
+# The result cache and --rerun: a test reading an input file, a test that
+# depends on it, and an unrelated test
+suite = '''
+reader:
+  args: "data.txt"
+  executable: cat
+  checks: [{type: HasStringCheck, line_key: "hello"}]
+after_reader:
+  args: "-c 'echo after'"
+  executable: sh
+  dependencies: ["reader"]
+  checks: [{type: HasStringCheck, line_key: "after"}]
+other:
+  args: "-c 'echo other'"
+  executable: sh
+  checks: [{type: HasStringCheck, line_key: "other"}]
+'''
+
+
+def cachedStatus(run: SuiteRun) -> dict:
+    """The tests run, and whether their result came from the cache."""
+    return {name: "[cached]" in line for name, line in run.statusLines().items()}
+
+
+def writeInput(suite_dir: str, text: str) -> None:
+    with open(os.path.join(suite_dir, "data.txt"), "w") as data_file:
+        data_file.write(text)
+
+
+with suiteDirectory(suite) as suite_dir:
+    writeInput(suite_dir, "hello 1\n")
+    cache_dir = os.path.join(suite_dir, "cache")
+
+    # A hit on the second run
+    assert cachedStatus(SuiteRun(suite_dir, "--cache_dir", cache_dir)) == \
+           dict(reader=False, after_reader=False, other=False)
+    assert cachedStatus(SuiteRun(suite_dir, "--cache_dir", cache_dir)) == \
+           dict(reader=True, after_reader=True, other=True)
+
+    # A changed input invalidates the test that reads it
+    writeInput(suite_dir, "hello 2\n")
+    assert cachedStatus(SuiteRun(suite_dir, "--cache_dir", cache_dir)) == \
+           dict(reader=False, after_reader=True, other=True)
+
+    # --rerun runs nothing after a full run, then the test whose input
+    # changed and its dependent
+    SuiteRun(suite_dir)
+    run = SuiteRun(suite_dir, "--rerun")
+    assert "Re-running 0 of 3 tests" in run.output_
+    assert cachedStatus(run) == {}
+
+    writeInput(suite_dir, "hello 3\n")
+    run = SuiteRun(suite_dir, "--rerun")
+    assert "Re-running 2 of 3 tests: 0 new, 0 failed, 1 changed, 1 dependent" in run.output_
+    assert cachedStatus(run) == dict(reader=False, after_reader=False)
+
+print("ResultCache OK")
@@ -0,0 +1,72 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path)
+
+from SuiteRunner import suiteDirectory, SuiteRun
+
+# Dependencies on tests filtered out by weight class, and on failed tests
+dependencies_suite = '''
+long_test:
+  args: "-c 'echo long'"
+  executable: sh
+  weight_class: long
+  checks: [{type: ExitCodeCheck, gold_value: 0}]
+needs_long:
+  args: "-c 'echo short'"
+  executable: sh
+  dependencies: ["long_test"]
+  checks: [{type: ExitCodeCheck, gold_value: 0}]
+failing:
+  args: "-c 'exit 1'"
+  executable: sh
+  checks: [{type: ExitCodeCheck, gold_value: 0}]
+needs_failing:
+  args: "-c 'echo never'"
+  executable: sh
+  dependencies: ["failing"]
+  checks: [{type: ExitCodeCheck, gold_value: 0}]
+'''
+
+with suiteDirectory(dependencies_suite) as suite_dir:
+    run = SuiteRun(suite_dir, expected_code=1)
+    lines = run.statusLines()
+    assert set(lines) == {"needs_long", "failing", "needs_failing"}
+    assert "Passed" in lines["needs_long"]
+    assert "Failed" in lines["failing"]
+    assert "skipped:dependency failing failed" in lines["needs_failing"]
+    assert "Number of failed tests  : 2" in run.output_
+
+    # With the long test allowed too, it runs first
+    run = SuiteRun(suite_dir, "-w", "5", expected_code=1)
+    assert "Passed" in run.statusLines()["long_test"]
+    assert "Passed" in run.statusLines()["needs_long"]
+
+# Stopping after failures. With one job slot the tests run one at a time, but
+# the next test may start while a failed one is post-processed: the tests
+# after the first failures sleep, so that the last one can never start.
+failures_suite = ""
+for k, name in enumerate(["fail_1", "fail_2", "pass_1", "pass_2"]):
+    failures_suite += f'''
+{name}:
+  args: "-c 'sleep {0 if k < 2 else 0.5}; exit {1 if name.startswith("fail") else 0}'"
+  executable: sh
+  checks: [{{type: ExitCodeCheck, gold_value: 0}}]
+'''
+
+with suiteDirectory(failures_suite) as suite_dir:
+    run = SuiteRun(suite_dir, "-j", "1", "--fail_fast", expected_code=1)
+    lines = run.statusLines()
+    assert "Failed" in lines["fail_1"] and "pass_1" not in lines
+    assert "Stopping after 1 failed test(s)" in run.output_
+    assert f"Number of tests not run : {4 - len(lines)}" in run.output_
+
+    run = SuiteRun(suite_dir, "-j", "1", "--max_failures", "2", expected_code=1)
+    lines = run.statusLines()
+    assert "Failed" in lines["fail_1"] and "Failed" in lines["fail_2"]
+    assert "pass_2" not in lines
+    assert "Stopping after 2 failed test(s)" in run.output_
+    assert f"Number of tests not run : {4 - len(lines)}" in run.output_
+
+print("Dependencies OK")
@@ -0,0 +1,58 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path)
+
+import os
+import time
+import signal
+import subprocess
+
+from SuiteRunner import suiteDirectory, TEST_SYSTEM_EXE
+
+# A test that would outlive the test system: its process must be killed when
+# the test system is interrupted, although it runs in a session of its own
+suite = '''
+sleeper:
+  args: "-c 'echo $$ > sleeper.pid; exec sleep 60'"
+  executable: sh
+  checks: [{type: ExitCodeCheck, gold_value: 0}]
+'''
+
+def processRuns(pid: int) -> bool:
+    """Whether a process exists and is not a zombie, which the killed test
+    becomes until whoever inherits it reaps it."""
+    try:
+        with open(f"/proc/{pid}/stat") as stat_file:
+            state = stat_file.read().rsplit(")", 1)[1].split()[0]
+    except OSError:
+        return False
+    return state not in "ZX"
+
+for sig in [signal.SIGINT, signal.SIGTERM]:
+    with suiteDirectory(suite) as suite_dir:
+        pid_file_name = os.path.join(suite_dir, "sleeper.pid")
+        process = subprocess.Popen([sys.executable, TEST_SYSTEM_EXE, "-d", suite_dir,
+                                    "--no_progress"],
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True)
+        deadline = time.perf_counter() + 30.0
+        while not os.path.exists(pid_file_name) or os.path.getsize(pid_file_name) == 0:
+            assert time.perf_counter() < deadline, "the test did not start"
+            time.sleep(0.05)
+        with open(pid_file_name) as pid_file:
+            sleeper_pid = int(pid_file.read())
+
+        process.send_signal(sig)
+        output, _ = process.communicate(timeout=30)
+        print(output)
+        assert process.returncode == 130, f"exit code {process.returncode}"
+        assert f"Interrupted ({sig.name})" in output
+
+        deadline = time.perf_counter() + 10.0
+        while processRuns(sleeper_pid):
+            assert time.perf_counter() < deadline, f"{sig.name}: the test was orphaned"
+            time.sleep(0.05)
+
+print("Interrupt OK")
@@ -0,0 +1,65 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path)
+sys.path.append(file_path + "../tfc_TestSystem")
+
+import os
+
+from SuiteRunner import suiteDirectory, SuiteRun
+from CoreAllocator import CoreAllocator, parseCPUList, formatCPUList
+
+assert parseCPUList("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+assert formatCPUList([0, 1, 5]) == "0,1,5"
+
+# Two NUMA nodes of four CPUs
+allocator = CoreAllocator(list(range(8)))
+allocator.numa_nodes_ = [[0, 1, 2, 3], [4, 5, 6, 7]]
+assert allocator.numCPUs() == 8
+
+# Allocations stay within a node, the one that fits best
+first = allocator.allocate(3)
+assert first == [0, 1, 2]
+second = allocator.allocate(2)
+assert second == [4, 5]
+assert allocator.allocate(1) == [3]
+assert allocator.numFree() == 2
+
+# Not enough free CPUs
+assert allocator.allocate(3) is None
+assert allocator.numFree() == 2
+
+# Released CPUs can be allocated again, spread over the nodes if need be
+allocator.release(first)
+assert allocator.numFree() == 5
+assert allocator.allocate(5) == [0, 1, 2, 6, 7]
+assert allocator.numFree() == 0
+
+# Commands are prefixed with taskset, if available and CPUs were allocated
+allocator.taskset_ = "/usr/bin/taskset"
+assert allocator.wrapArgs(["prog", "-x"], [4, 5]) == \
+       ["/usr/bin/taskset", "-c", "4,5", "prog", "-x"]
+assert allocator.wrapArgs(["prog", "-x"], []) == ["prog", "-x"]
+allocator.taskset_ = None
+assert allocator.wrapArgs(["prog", "-x"], [4, 5]) == ["prog", "-x"]
+
+# With --bind_cores the test gets its CPUs, the postrun script, run after they
+# have been released, gets none
+suite = '''
+bound:
+  args: "-c 'echo cpus:$CPU_LIST'"
+  executable: sh
+  postrun_script: "echo cpus:$CPU_LIST > postrun.txt"
+  checks: [{type: HasStringCheck, line_key: "cpus:"}]
+'''
+
+with suiteDirectory(suite) as suite_dir:
+    SuiteRun(suite_dir, "-j", "1", "--bind_cores")
+    with open(os.path.join(suite_dir, "out", "bound.cout")) as out_file:
+        cpus = out_file.read().split("cpus:")[-1].split()[0]
+    assert parseCPUList(cpus) == [min(os.sched_getaffinity(0))]
+    with open(os.path.join(suite_dir, "postrun.txt")) as postrun_file:
+        assert postrun_file.read().strip() == "cpus:"
+
+print("CoreAllocator OK")
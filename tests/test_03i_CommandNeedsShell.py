@@ -0,0 +1,45 @@
+import pathlib
+file_path = str(pathlib.Path(__file__).parent.resolve()) + "/"
+
+import sys
+sys.path.append(file_path + "../")
+sys.path.append(file_path + "../tfc_TestSystem")
+
+from TFCTestObject import commandNeedsShell
+
+# Plain commands are executed directly
+assert not commandNeedsShell("")
+assert not commandNeedsShell("sim -i input.yaml --option=1")
+assert not commandNeedsShell("sim a\\ b")
+
+# Quoted metacharacters are arguments, except for expansions in double quotes
+assert not commandNeedsShell("sim 'a|b' \"x;y\" '$HOME' \"*.yaml\"")
+assert commandNeedsShell("sim \"$HOME\"")
+assert commandNeedsShell("sim \"`date`\"")
+
+# Pipes, redirection and command lists
+assert commandNeedsShell("sim | grep done")
+assert commandNeedsShell("sim > out.txt")
+assert commandNeedsShell("sim 2>&1")
+assert commandNeedsShell("sim < input.txt")
+assert commandNeedsShell("prepare && sim")
+assert commandNeedsShell("prepare; sim")
+assert commandNeedsShell("(cd run && sim)")
+
+# Environment assignments before the command
+assert commandNeedsShell("OMP_NUM_THREADS=2 sim")
+assert commandNeedsShell("A=1 B=2 sim")
+
+# Globbing, expansion and comments
+assert commandNeedsShell("sim *.yaml")
+assert commandNeedsShell("sim input?.yaml")
+assert commandNeedsShell("sim input[12].yaml")
+assert commandNeedsShell("sim ~/input.yaml")
+assert commandNeedsShell("sim $INPUT")
+assert commandNeedsShell("sim # comment")
+
+# Commands that cannot be tokenized are left to the shell to report
+assert commandNeedsShell("sim 'unterminated")
+assert commandNeedsShell("sim \"unterminated")
+
+print("commandNeedsShell OK")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import enum
+import array
 
 
 class ParameterType(enum.IntEnum):
@@ -21,12 +22,79 @@ class Parameter:
         self.name = name
         self.value = None
         self.sub_params = []  # Sub-list of Parameter
-        self.n = 0
+        # A frozen parameter may be shared, e.g. by a ParameterPool, and cannot
+        # be modified. Use copy() to obtain a modifiable one.
+        self.frozen = False
+        self._string_ = None
+        self._hash_ = None
+        self._array_ = None
 
         self.setValue(value)
 
+    def _checkNotFrozen(self) -> None:
+        if self.frozen:
+            raise Exception(f'ERROR: Parameter "{self.name}" is frozen and cannot be '
+                            'modified. Modify a copy() instead.')
+
+    def copy(self) -> Parameter:
+        """Returns a modifiable copy of this parameter. The sub-parameters are
+        shared with this one, not copied."""
+        new_param = Parameter(self.name, None)
+        new_param.type = self.type
+        new_param.value = self.value
+        new_param.sub_params = list(self.sub_params)
+        return new_param
+
+    def freeze(self) -> Parameter:
+        """Returns an immutable, hashable version of this parameter: itself if
+        it is already frozen, otherwise a frozen copy. Frozen sub-parameters
+        are shared rather than copied. Frozen parameters can be used as dict
+        keys and shared between threads."""
+        if self.frozen:
+            return self
+        frozen_param = Parameter(self.name, None)
+        frozen_param.type = self.type
+        frozen_param.value = self.value
+        frozen_param.sub_params = [sub_param.freeze() for sub_param in self.sub_params]
+        frozen_param.frozen = True
+        return frozen_param
+
+    def thaw(self, deep: bool = False) -> Parameter:
+        """Returns a modifiable version of this parameter. Without deep, only
+        the top level is copied and the sub-parameters stay shared (and
+        frozen): thaw each level to be modified (copy-on-write). With deep, the
+        whole tree is copied."""
+        new_param = self.copy()
+        if deep:
+            new_param.sub_params = [sub_param.thaw(deep=True)
+                                    for sub_param in self.sub_params]
+        return new_param
+
+    def __hash__(self) -> int:
+        """Frozen parameters hash by their contents, others by identity."""
+        if not self.frozen:
+            return object.__hash__(self)
+        if self._hash_ is None:
+            self._hash_ = hash((self.name, self.type, self.value, tuple(self.sub_params)))
+        return self._hash_
+
+    def __eq__(self, other) -> bool:
+        """Frozen parameters are equal if they have the same name, type, value
+        and sub-parameters. Other parameters are only equal to themselves."""
+        if self is other:
+            return True
+        if not isinstance(other, Parameter):
+            return NotImplemented
+        if not (self.frozen and other.frozen):
+            return False
+        if hash(self) != hash(other):
+            return False
+        return self.name == other.name and self.type == other.type and \
+               self.value == other.value and self.sub_params == other.sub_params
+
     def setValue(self, value):
         """Sets the value of the parameter. This could change the type of the parameter"""
+        self._checkNotFrozen()
         if isinstance(value, bool):
             self.type = ParameterType.BOOLEAN
             self.value = value
@@ -57,13 +125,16 @@ class Parameter:
             self.value = None
 
         elif isinstance(value, Parameter):
+            # The sub-parameter list of a frozen parameter must not be shared
+            # by a modifiable one
+            sub_params = list(value.sub_params) if value.frozen else value.sub_params
             if value.type == ParameterType.ARRAY:
                 self.type = ParameterType.ARRAY
-                self.sub_params = value.sub_params
+                self.sub_params = sub_params
                 self.value = None
             elif value.type == ParameterType.BLOCK:
                 self.type = ParameterType.BLOCK
-                self.sub_params = value.sub_params
+                self.sub_params = sub_params
                 self.value = None
             else:
                 self.type = value.type
@@ -74,6 +145,8 @@ class Parameter:
 
     def addParameter(self, name: str, value: any) -> None:
         """Adds a parameter to the list of sub-parameters."""
+        self._checkNotFrozen()
+
         # First check for duplicates
         for param in self.sub_params:
             if param.name == name:
@@ -113,10 +186,71 @@ class Parameter:
                             f' type {str(self.type)}')
         return str(self.value)
 
+    def _checkArray(self, kind: str) -> None:
+        if self.type != ParameterType.ARRAY:
+            raise Exception(f'ERROR: Cannot convert parameter "{self.name}" to {kind} '
+                            f'array. It is of type {str(self.type)}')
+
+    def _elementValues(self) -> list:
+        """The values of the elements of an array parameter."""
+        return [sub_param.value for sub_param in self.sub_params]
+
+    def _packArray(self, typecode: str, values: list,
+                   element_getter) -> array.array:
+        """Packs values into an array.array in one call. Elements the array
+        does not accept (e.g. floats into an integer array) are converted one by
+        one with element_getter, which raises the usual errors."""
+        if self.frozen and self._array_ is not None and \
+           self._array_.typecode == typecode:
+            return array.array(typecode, self._array_)
+        try:
+            packed = array.array(typecode, values)
+        except (TypeError, OverflowError):
+            packed = array.array(typecode, [element_getter(sub_param)
+                                            for sub_param in self.sub_params])
+        if self.frozen:
+            self._array_ = packed
+            return array.array(typecode, packed)
+        return packed
+
+    def getFloatArray(self) -> array.array:
+        """Returns the values of an array parameter as an array.array of
+        doubles ("d"). It supports the buffer protocol, so e.g.
+        numpy.asarray can wrap it without a copy."""
+        self._checkArray("float")
+        return self._packArray("d", self._elementValues(), Parameter.getFloatValue)
+
+    def getIntegerArray(self) -> array.array:
+        """Returns the values of an array parameter as an array.array of 64-bit
+        integers ("q")."""
+        self._checkArray("integer")
+        return self._packArray("q", self._elementValues(), Parameter.getIntegerValue)
+
+    def getStringList(self) -> list[str]:
+        """Returns the values of an array parameter of strings as a list."""
+        self._checkArray("string")
+        values = self._elementValues()
+        for value in values:
+            if not isinstance(value, str):
+                # Raises the error of the first element that is not a string
+                for sub_param in self.sub_params:
+                    sub_param.getStringValue()
+        return list(values)
+
     def getValue(self):
         """Returns the arbitrary value of the parameter"""
         return self.value
 
+    def getPythonValue(self):
+        """Returns the value of the parameter as plain Python values: a dict
+        for a block, a list for an array."""
+        if self.type == ParameterType.BLOCK:
+            return {sub_param.name: sub_param.getPythonValue()
+                    for sub_param in self.sub_params}
+        if self.type == ParameterType.ARRAY:
+            return [sub_param.getPythonValue() for sub_param in self.sub_params]
+        return self.value
+
     def getParam(self, str_or_num) -> Parameter:
         """Returns the sub-parameter at the given index or name"""
         if isinstance(str_or_num, str):
@@ -129,19 +263,19 @@ class Parameter:
         raise Exception(
             f'ERROR: Parameter "{self.name}" has no sub-parameter with key "{str_or_num}"')
 
-    def __iter__(self) -> Parameter:
-        self.n = 0
-        return self
-
-    def __next__(self) -> Parameter:
-        if self.n < len(self.sub_params):
-            ret_val = self.sub_params[self.n]
-            self.n += 1
-            return ret_val
-        else:
-            raise StopIteration
+    def __iter__(self):
+        # An independent iterator, so that shared parameters can be iterated
+        # by several loops/threads at once
+        return iter(self.sub_params)
 
     def __str__(self) -> str:
+        if self.frozen:
+            if self._string_ is None:
+                self._string_ = self._toString()
+            return self._string_
+        return self._toString()
+
+    def _toString(self) -> str:
         if self.type == ParameterType.BOOLEAN:
             return "True" if self.value == True else "False"
         elif self.type == ParameterType.INTEGER or self.type == ParameterType.FLOAT:
@@ -178,13 +312,13 @@ class InputParameters(Parameter):
 
         self.tags = {}
         self.params_at_assignment_ = None
+        self.compiled_schema_ = None
 
     def addOptionalParam(self, param_name: str, default_value: any, doc_string: str,
                              tags: list = []):
         """Adds an optional parameter."""
 
-        if param_name in self.sub_params:
-            raise Exception(f'ERROR: Parameter "{param_name}" already exists')
+        # addParameter rejects duplicate names
         self.addParameter(param_name, default_value)
 
         tag_list = []
@@ -203,9 +337,7 @@ class InputParameters(Parameter):
                          tags: list = []):
         """Adds a required parameter."""
 
-        if param_name in self.sub_params:
-            raise Exception(f'ERROR: Parameter "{param_name}" already exists')
-
+        # addParameter rejects duplicate names
         if param_type == ParameterType.BOOLEAN:
             self.addParameter(param_name, False)
         elif param_type == ParameterType.INTEGER:
@@ -231,57 +363,77 @@ class InputParameters(Parameter):
         for tag in tags:
             tag_list.append(tag)
 
-    def assignParameters(self, params: Parameter):
-        """Assigns a parameter block to this input-parameters block"""
-
-        self.params_at_assignment_ = params
+    def clone(self) -> InputParameters:
+        """Returns a copy that can be assigned and modified independently of
+        this block. The tags are shared, the parameters are copied, including
+        the elements of array and block defaults."""
+        new_params = InputParameters()
+        new_params.tags = self.tags
+        for param in self.sub_params:
+            copy = Parameter(param.name, param)
+            if copy.type == ParameterType.ARRAY or copy.type == ParameterType.BLOCK:
+                copy.sub_params = [sub_param.thaw(deep=True)
+                                   for sub_param in param.sub_params]
+            new_params.sub_params.append(copy)
+        return new_params
+
+    def hasTag(self, param_name: str, tag_name: str) -> bool:
+        for tag in self.tags.get(param_name, []):
+            if tag.tag_name == tag_name:
+                return True
+        return False
+
+    def checkParameters(self, params: Parameter) -> list[str]:
+        """Checks, without assigning anything, that a parameter block can be
+        assigned to this input-parameters block. Returns all the errors found,
+        in the order assignParameters would encounter them."""
+        errors = []
+        in_params = {in_param.name: in_param for in_param in self.sub_params}
+        supplied = set()
 
         # First check all the parameters are valid
-        for param in params:
-            is_valid = False
-            for in_param in self.sub_params:
-                if in_param.name == param.name:
-                    is_valid = True
-                    break
-
-            if not is_valid:
-                raise Exception(
-                    f'ERROR: Parameter "{param.name}" is not a valid parameter.')
+        for param in params.sub_params:
+            supplied.add(param.name)
+            if param.name not in in_params:
+                errors.append(f'ERROR: Parameter "{param.name}" is not a valid parameter.')
 
         # Now check params has all the required params
         for in_param in self.sub_params:
-            tag_list = self.tags[in_param.name]
-
-            for tag in tag_list:
-                if tag.tag_name == "required":
-                    found = False
-                    for param in params:
-                        if param.name == in_param.name:
-                            found = True
-                            break
-
-                    if not found:
-                        raise Exception(f'ERROR: Required parameter "{in_param.name}"'
-                                        ' not supplied.')
-
-        # Now assign the parameters
-        for param in params:
-            for in_param in self.sub_params:
-                if in_param.name == param.name:
-                    tag_list = self.tags[in_param.name]
-
-                    mutable = False
-                    for tag in tag_list:
-                        if tag.tag_name == "mutable":
-                            mutable = True
-                            break
-
-                    if mutable:
-                        in_param.setValue(param)
-                    else:
-                        if in_param.type != param.type:
-                            raise Exception(f'ERROR: Attempting to assign type {str(param.type)}'
-                                            f' to parameter "{in_param.name}" which is of type '
-                                            f'{str(in_param.type)}')
-
-                        in_param.setValue(param)
+            if in_param.name not in supplied and self.hasTag(in_param.name, "required"):
+                errors.append(f'ERROR: Required parameter "{in_param.name}"'
+                              ' not supplied.')
+
+        # Now check the types of non-mutable parameters
+        for param in params.sub_params:
+            in_param = in_params.get(param.name)
+            if in_param is None or self.hasTag(in_param.name, "mutable"):
+                continue
+            if in_param.type != param.type:
+                errors.append(f'ERROR: Attempting to assign type {str(param.type)}'
+                              f' to parameter "{in_param.name}" which is of type '
+                              f'{str(in_param.type)}')
+
+        return errors
+
+    def assignParameters(self, params: Parameter, check: bool = True):
+        """Assigns a parameter block to this input-parameters block. The check
+        can be skipped if checkParameters has already been called."""
+
+        self.params_at_assignment_ = params
+
+        if check:
+            errors = self.checkParameters(params)
+            if len(errors) > 0:
+                raise Exception(errors[0])
+
+        # Now assign the parameters. Modifiable arrays and blocks are taken as
+        # they are, rather than through their sub-parameters, so that e.g. a
+        # LazyParameter is not expanded.
+        in_indices = {in_param.name: k for k, in_param in enumerate(self.sub_params)}
+        for param in params.sub_params:
+            k = in_indices[param.name]
+            if not param.frozen and (param.type == ParameterType.ARRAY or
+                                     param.type == ParameterType.BLOCK):
+                self.sub_params[k] = param
+            else:
+                self.sub_params[k].setValue(param)
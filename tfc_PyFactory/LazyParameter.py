@@ -0,0 +1,92 @@
+from __future__ import annotations
+from .InputParameters import Parameter, ParameterType
+
+
+class LazyParameter(Parameter):
+    """A Parameter over an existing dict or list (e.g. as loaded from YAML or
+    JSON) whose sub-parameters are only created when they are accessed. A
+    getParam by name/index creates just that sub-parameter; iterating, or any
+    other access to sub_params, creates the sub-parameters of that level only.
+    Sub-parameters are themselves lazy. The typed getters behave as for
+    Parameter; the array getters (getFloatArray etc.) of an array read the
+    wrapped list directly.
+
+    The wrapped dict/list is never modified, but it must not be modified while
+    the parameter is in use either."""
+
+    def __init__(self, name: str, value: any) -> None:
+        self._source_ = None
+        self._children_: dict[str, Parameter] = {}
+        self._sub_params_: list[Parameter] = None
+        super().__init__(name, value)
+
+    @property
+    def sub_params(self) -> list[Parameter]:
+        if self._sub_params_ is None:
+            self._materialize()
+        return self._sub_params_
+
+    @sub_params.setter
+    def sub_params(self, sub_params: list[Parameter]) -> None:
+        self._sub_params_ = sub_params
+        self._source_ = None
+        self._children_ = {}
+
+    def _child(self, name: str, value: any) -> Parameter:
+        child = self._children_.get(name)
+        if child is None:
+            child = LazyParameter(name, value)
+            self._children_[name] = child
+        return child
+
+    def _materialize(self) -> None:
+        """Creates the sub-parameters of this level."""
+        source = self._source_
+        sub_params = []
+        if isinstance(source, dict):
+            sub_params = [self._child(sub_name, source[sub_name]) for sub_name in source]
+        elif isinstance(source, list):
+            sub_params = [self._child(str(k), sub_value)
+                          for k, sub_value in enumerate(source)]
+        self._sub_params_ = sub_params
+        self._source_ = None
+        self._children_ = {}
+
+    def setValue(self, value):
+        # Like Parameter.setValue, a dict/list is added to existing
+        # sub-parameters, so only a parameter without any is made lazy
+        if not self.frozen and not self._sub_params_ and \
+           (isinstance(value, dict) or isinstance(value, list)):
+            self._source_ = value
+            self._children_ = {}
+            self._sub_params_ = None
+            self.type = ParameterType.BLOCK if isinstance(value, dict) \
+                        else ParameterType.ARRAY
+            self.value = None
+            return
+        super().setValue(value)
+
+    def getParam(self, str_or_num) -> Parameter:
+        source = self._source_
+        if self._sub_params_ is None and source is not None:
+            if isinstance(source, dict) and isinstance(str_or_num, str):
+                if str_or_num in source:
+                    return self._child(str_or_num, source[str_or_num])
+            elif isinstance(source, list) and not isinstance(str_or_num, str):
+                index = int(str_or_num)
+                # Negative indices refer to the same child as their positive
+                # counterpart
+                index = index + len(source) if index < 0 else index
+                if 0 <= index < len(source):
+                    return self._child(str(index), source[index])
+        return super().getParam(str_or_num)
+
+    def _elementValues(self) -> list:
+        # The values of an array none of whose elements has been accessed (and
+        # possibly modified) are read straight from the wrapped list, without
+        # creating its sub-parameters
+        source = self._source_
+        if self._sub_params_ is None and len(self._children_) == 0 and \
+           isinstance(source, list):
+            return source
+        return super()._elementValues()
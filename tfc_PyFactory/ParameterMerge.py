@@ -0,0 +1,168 @@
+from __future__ import annotations
+import enum
+from .InputParameters import Parameter, ParameterType
+
+
+class ListMergeStrategy(enum.IntEnum):
+    """How ParameterMerge.merge combines two arrays"""
+    REPLACE = 0,   # The override's array replaces the base's
+    APPEND = 1,    # The override's elements are appended to the base's
+    BY_INDEX = 2   # Elements at the same index are merged, extra ones kept
+
+
+class ParameterMerge:
+    """Deep merge and structural diff of Parameter trees. Both traverse the
+    trees once, and skip sub-trees that are the same object (e.g. interned by a
+    ParameterPool). A merged tree shares every sub-tree that the merge does not
+    change with its inputs rather than copying it. Its new nodes are frozen if
+    both inputs are, otherwise the inputs must not be modified while it is in
+    use."""
+
+    @staticmethod
+    def merge(base: Parameter, override: Parameter,
+              list_strategy: ListMergeStrategy = ListMergeStrategy.REPLACE,
+              list_strategies: dict[str, ListMergeStrategy] = None,
+              changes: list[tuple] = None) -> Parameter:
+        """Returns base deep-merged with override. Blocks are merged key by
+        key, arrays according to list_strategy, or to list_strategies for the
+        arrays at the given paths (e.g. "checks" or "a.b[2].c"), and anything
+        else is replaced by the override. Returns base itself if override
+        changes nothing.
+
+        If a changes list is supplied, the changes made to base are appended to
+        it, as by diff, during the same traversal."""
+        return ParameterMerge._merge(base, override, list_strategy,
+                                     list_strategies or {}, "", changes)
+
+    @staticmethod
+    def diff(old: Parameter, new: Parameter) -> list[tuple]:
+        """Returns the differences between two parameter trees as a list of
+        (path, old_param, new_param) tuples, where old_param is None for an
+        added parameter and new_param None for a removed one. Blocks are
+        compared by key, arrays by index."""
+        changes = []
+        ParameterMerge._diff(old, new, "", changes)
+        return changes
+
+    @staticmethod
+    def _node(name: str, param_type: ParameterType, sub_params: list[Parameter],
+              frozen: bool) -> Parameter:
+        node = Parameter(name, None)
+        node.type = param_type
+        node.sub_params = sub_params
+        node.frozen = frozen
+        return node
+
+    @staticmethod
+    def _renamed(param: Parameter, name: str) -> Parameter:
+        if param.name == name:
+            return param
+        renamed = param.copy()
+        renamed.name = name
+        renamed.frozen = param.frozen
+        return renamed
+
+    @staticmethod
+    def _merge(base: Parameter, override: Parameter, list_strategy: ListMergeStrategy,
+               list_strategies: dict, path: str, changes: list) -> Parameter:
+        if base is override:
+            return base
+        frozen = base.frozen and override.frozen
+
+        if base.type == ParameterType.BLOCK and override.type == ParameterType.BLOCK:
+            prefix = path + "." if path != "" else ""
+            remaining = {param.name: param for param in override.sub_params}
+            sub_params = []
+            changed = base.name != override.name
+            for sub_param in base.sub_params:
+                sub_override = remaining.pop(sub_param.name, None)
+                if sub_override is not None:
+                    merged = ParameterMerge._merge(sub_param, sub_override, list_strategy,
+                                                   list_strategies,
+                                                   prefix + sub_param.name, changes)
+                    changed = changed or merged is not sub_param
+                    sub_param = merged
+                sub_params.append(sub_param)
+            for sub_name, sub_param in remaining.items():
+                changed = True
+                sub_params.append(sub_param)
+                if changes is not None:
+                    changes.append((prefix + sub_name, None, sub_param))
+            if not changed:
+                return base
+            return ParameterMerge._node(override.name, ParameterType.BLOCK,
+                                        sub_params, frozen)
+
+        if base.type == ParameterType.ARRAY and override.type == ParameterType.ARRAY:
+            strategy = list_strategies.get(path, list_strategy)
+            num_base = len(base.sub_params)
+            if strategy == ListMergeStrategy.APPEND:
+                if len(override.sub_params) == 0 and base.name == override.name:
+                    return base
+                sub_params = list(base.sub_params)
+                for k, element in enumerate(override.sub_params, start=num_base):
+                    element = ParameterMerge._renamed(element, str(k))
+                    sub_params.append(element)
+                    if changes is not None:
+                        changes.append((f"{path}[{k}]", None, element))
+                return ParameterMerge._node(override.name, ParameterType.ARRAY,
+                                            sub_params, frozen)
+
+            if strategy == ListMergeStrategy.BY_INDEX:
+                sub_params = []
+                changed = base.name != override.name or \
+                          len(override.sub_params) > num_base
+                for k, element in enumerate(override.sub_params):
+                    if k < num_base:
+                        merged = ParameterMerge._merge(base.sub_params[k], element,
+                                                       list_strategy, list_strategies,
+                                                       f"{path}[{k}]", changes)
+                        changed = changed or merged is not base.sub_params[k]
+                        element = merged
+                    elif changes is not None:
+                        changes.append((f"{path}[{k}]", None, element))
+                    sub_params.append(element)
+                if not changed:
+                    return base
+                sub_params += base.sub_params[len(sub_params):]
+                return ParameterMerge._node(override.name, ParameterType.ARRAY,
+                                            sub_params, frozen)
+
+        # Replaced by the override
+        if changes is not None:
+            ParameterMerge._diff(base, override, path, changes)
+        return override
+
+    @staticmethod
+    def _diff(old: Parameter, new: Parameter, path: str, changes: list) -> None:
+        if old is new:
+            return
+
+        if old.type == ParameterType.BLOCK and new.type == ParameterType.BLOCK:
+            prefix = path + "." if path != "" else ""
+            remaining = {param.name: param for param in old.sub_params}
+            for sub_param in new.sub_params:
+                old_sub_param = remaining.pop(sub_param.name, None)
+                if old_sub_param is None:
+                    changes.append((prefix + sub_param.name, None, sub_param))
+                else:
+                    ParameterMerge._diff(old_sub_param, sub_param,
+                                         prefix + sub_param.name, changes)
+            for sub_name, old_sub_param in remaining.items():
+                changes.append((prefix + sub_name, old_sub_param, None))
+
+        elif old.type == ParameterType.ARRAY and new.type == ParameterType.ARRAY:
+            num_old = len(old.sub_params)
+            num_new = len(new.sub_params)
+            for k in range(max(num_old, num_new)):
+                element_path = f"{path}[{k}]"
+                if k >= num_old:
+                    changes.append((element_path, None, new.sub_params[k]))
+                elif k >= num_new:
+                    changes.append((element_path, old.sub_params[k], None))
+                else:
+                    ParameterMerge._diff(old.sub_params[k], new.sub_params[k],
+                                         element_path, changes)
+
+        elif old.type != new.type or old.value != new.value:
+            changes.append((path, old, new))
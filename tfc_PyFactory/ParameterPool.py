@@ -0,0 +1,119 @@
+from __future__ import annotations
+from .InputParameters import Parameter, ParameterType
+
+
+class ParameterPool:
+    """A hash-consing table of frozen Parameter nodes. Structurally identical
+    sub-trees (same names, types and values) interned through the same pool
+    become a single shared node, e.g. the check blocks of all the tests
+    created from one template. Shared nodes are frozen; copy() one to modify
+    it (copy-on-write).
+
+    Values that are the same Python object (as produced by the shallow copies
+    of template expansion) are converted only once."""
+
+    def __init__(self) -> None:
+        self.nodes_: dict[tuple, Parameter] = {}
+        # (name, id(value)) -> (value, node). The value is kept so that its id
+        # cannot be reused while the pool exists.
+        self.by_identity_: dict[tuple, tuple] = {}
+
+    def numNodes(self) -> int:
+        return len(self.nodes_)
+
+    def intern(self, name, value) -> Parameter:
+        """Returns the frozen, shared parameter for a name and a value (a dict,
+        list, primitive or Parameter, e.g. the result of a ParameterMerge)."""
+        if isinstance(value, Parameter):
+            return self._internParameter(name, value)
+
+        is_container = isinstance(value, dict) or isinstance(value, list)
+        if is_container:
+            identity = (name, id(value))
+            known = self.by_identity_.get(identity)
+            if known is not None and known[0] is value:
+                return known[1]
+
+        children = None
+        if isinstance(value, dict):
+            children = [self.intern(sub_name, value[sub_name]) for sub_name in value]
+            key = ("B", name, tuple(id(child) for child in children))
+        elif isinstance(value, list):
+            children = [self.intern(str(k), sub_value) for k, sub_value in enumerate(value)]
+            key = ("A", name, tuple(id(child) for child in children))
+        else:
+            key = ("V", name, type(value), value)
+            try:
+                hash(key)
+            except TypeError:
+                # Not a primitive; such values are not shared
+                node = Parameter(name, value)
+                node.frozen = True
+                return node
+
+        node = self.nodes_.get(key)
+        if node is None:
+            if children is None:
+                node = Parameter(name, value)
+            else:
+                node = Parameter(name, None)
+                node.type = ParameterType.BLOCK if isinstance(value, dict) \
+                            else ParameterType.ARRAY
+                node.sub_params = children
+            node.frozen = True
+            self.nodes_[key] = node
+
+        if is_container:
+            self.by_identity_[identity] = (value, node)
+        return node
+
+    def _internParameter(self, name: str, param: Parameter) -> Parameter:
+        """Interns a Parameter tree bottom-up. A frozen parameter, or sub-tree,
+        is itself the shared node unless an identical one is already known, and
+        is only traversed once."""
+        if param.frozen:
+            identity = (name, id(param))
+            known = self.by_identity_.get(identity)
+            if known is not None and known[0] is param:
+                return known[1]
+
+        children = None
+        if param.type == ParameterType.BLOCK or param.type == ParameterType.ARRAY:
+            children = [self._internParameter(sub_param.name, sub_param)
+                        for sub_param in param.sub_params]
+            key = ("B" if param.type == ParameterType.BLOCK else "A", name,
+                   tuple(id(child) for child in children))
+        else:
+            # The same key as for the primitive value itself
+            key = ("V", name, type(param.value), param.value)
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+
+        node = self.nodes_.get(key) if key is not None else None
+        if node is None:
+            if param.frozen and param.name == name and \
+               (children is None or all(child is sub_param for child, sub_param
+                                        in zip(children, param.sub_params))):
+                node = param
+            else:
+                node = Parameter(name, None)
+                node.type = param.type
+                node.value = param.value
+                node.sub_params = children if children is not None else []
+                node.frozen = True
+            if key is not None:
+                self.nodes_[key] = node
+
+        if param.frozen:
+            self.by_identity_[identity] = (param, node)
+        return node
+
+    def makeBlock(self, value: dict) -> Parameter:
+        """Returns a new, modifiable, parameter block whose sub-parameters are
+        interned. E.g. the parameters of one test."""
+        block = Parameter("", None)
+        block.type = ParameterType.BLOCK
+        block.sub_params = [self.intern(sub_name, value[sub_name]) for sub_name in value]
+        return block
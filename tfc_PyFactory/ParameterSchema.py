@@ -0,0 +1,188 @@
+from __future__ import annotations
+from .InputParameters import Parameter, ParameterType, InputParameters
+
+# Maximum number of validated blocks whose errors are cached per schema
+SCHEMA_CACHE_SIZE = 4096
+
+
+class SchemaEntry:
+    """The compiled constraints of one input parameter, taken from its tags:
+      "mutable"      : the type may change on assignment,
+      "element_type" : the ParameterType of each element of an array,
+      "schema"       : an InputParameters describing the contents of a block,
+                       or of each element of an array of blocks,
+      "range"        : a (minimum, maximum) pair for a number, or each number
+                       in an array. Either bound may be None,
+      "enum"         : the allowed values of the parameter, or of each
+                       element of an array."""
+
+    def __init__(self, param: Parameter, input_params: InputParameters) -> None:
+        self.name = param.name
+        self.type = param.type
+        self.required = False
+        self.mutable = False
+        self.element_type: ParameterType = None
+        self.schema: ParameterSchema = None
+        self.minimum = None
+        self.maximum = None
+        self.choices: list = None
+
+        for tag in input_params.tags.get(param.name, []):
+            if tag.tag_name == "required":
+                self.required = True
+            elif tag.tag_name == "mutable":
+                self.mutable = True
+            elif tag.tag_name == "element_type":
+                self.element_type = ParameterType(tag.value)
+            elif tag.tag_name == "schema":
+                self.schema = ParameterSchema.compile(tag.value)
+            elif tag.tag_name == "range":
+                self.minimum, self.maximum = tag.value
+            elif tag.tag_name == "enum":
+                self.choices = list(tag.value)
+
+        self.constrained = self.element_type is not None or self.schema is not None or \
+                           self.minimum is not None or self.maximum is not None or \
+                           self.choices is not None
+
+    def validateValue(self, param: Parameter, path: str, errors: list[str]) -> None:
+        """Checks the range and enum constraints of a single value."""
+        if self.choices is not None and param.value not in self.choices:
+            errors.append(f'ERROR: Parameter "{path}" has value {param} which is '
+                          f'not one of {self.choices}.')
+        if param.type == ParameterType.INTEGER or param.type == ParameterType.FLOAT:
+            if self.minimum is not None and param.value < self.minimum:
+                errors.append(f'ERROR: Parameter "{path}" has value {param} which is '
+                              f'less than the minimum {self.minimum}.')
+            if self.maximum is not None and param.value > self.maximum:
+                errors.append(f'ERROR: Parameter "{path}" has value {param} which is '
+                              f'greater than the maximum {self.maximum}.')
+
+    def validate(self, param: Parameter, path: str, errors: list[str]) -> None:
+        """Checks a supplied parameter against this entry, the type check
+        excepted."""
+        if not self.constrained:
+            return
+        if param.type == ParameterType.ARRAY:
+            for k, element in enumerate(param.sub_params):
+                element_path = f"{path}[{k}]"
+                if self.element_type is not None and element.type != self.element_type:
+                    errors.append(f'ERROR: Element "{element_path}" is of type '
+                                  f'{element.type.name} but should be of type '
+                                  f'{self.element_type.name}')
+                    continue
+                if element.type == ParameterType.BLOCK:
+                    if self.schema is not None:
+                        self.schema.validate(element, errors, element_path)
+                else:
+                    self.validateValue(element, element_path, errors)
+        elif param.type == ParameterType.BLOCK:
+            if self.schema is not None:
+                self.schema.validate(param, errors, path)
+        else:
+            self.validateValue(param, path, errors)
+
+
+class ParameterSchema:
+    """The compiled form of an InputParameters block. It validates a whole
+    Parameter tree, including nested arrays and blocks, in a single traversal.
+    The errors of top-level blocks that have already been validated are cached
+    by the block's frozen contents, so that e.g. identical check blocks from a
+    template are only validated once. Schemas are compiled once per
+    InputParameters, see compile."""
+
+    def __init__(self, input_params: InputParameters) -> None:
+        self.entries_: dict[str, SchemaEntry] = {}
+        self.required_: list[str] = []
+        self.cache_: dict[tuple, list[str]] = {}
+
+        # Guards against recursive schemas
+        input_params.compiled_schema_ = self
+
+        for param in input_params.sub_params:
+            entry = SchemaEntry(param, input_params)
+            self.entries_[param.name] = entry
+            if entry.required:
+                self.required_.append(param.name)
+
+        # Whether a string "name", as added by the factory, can cause no error
+        name_entry = self.entries_.get("name")
+        self.name_is_free_ = name_entry is not None and \
+                             name_entry.type == ParameterType.STRING and \
+                             name_entry.choices is None
+
+    @staticmethod
+    def compile(input_params: InputParameters) -> ParameterSchema:
+        """Returns the schema of an InputParameters block, compiling it on the
+        first call."""
+        schema = getattr(input_params, "compiled_schema_", None)
+        if schema is None:
+            schema = ParameterSchema(input_params)
+        return schema
+
+    def _cacheKey(self, params: Parameter) -> tuple:
+        """Returns the cache key of a top-level block, or None if it is not
+        cached. Only blocks whose sub-parameters are all frozen (e.g. shared
+        through a ParameterPool) are cached, so that the key costs a lookup of
+        their cached hashes rather than a traversal. The "name" added by the
+        factory is left out, if it cannot cause an error, so that the blocks of
+        different objects share a key."""
+        has_name = False
+        key = []
+        for param in params.sub_params:
+            if param.name == "name" and param.type == ParameterType.STRING and \
+               self.name_is_free_:
+                has_name = True
+                continue
+            if not param.frozen:
+                return None
+            key.append(param)
+        return (has_name, tuple(key))
+
+    def validate(self, params: Parameter, errors: list[str] = None,
+                 path: str = "") -> list[str]:
+        """Validates a parameter block, appending the errors to errors (a new
+        list if None), which is returned. The errors of the top-level block
+        are the same, and in the same order, as those of
+        InputParameters.checkParameters. Errors in nested blocks name the full
+        path of the offending parameter."""
+        if errors is None:
+            errors = []
+
+        key = self._cacheKey(params) if path == "" else None
+        if key is not None and key in self.cache_:
+            errors += self.cache_[key]
+            return errors
+
+        block_errors = []
+        prefix = path + "." if path != "" else ""
+
+        supplied = set()
+        for param in params.sub_params:
+            supplied.add(param.name)
+            if param.name not in self.entries_:
+                block_errors.append(f'ERROR: Parameter "{prefix}{param.name}" '
+                                    'is not a valid parameter.')
+
+        for name in self.required_:
+            if name not in supplied:
+                block_errors.append(f'ERROR: Required parameter "{prefix}{name}"'
+                                    ' not supplied.')
+
+        for param in params.sub_params:
+            entry = self.entries_.get(param.name)
+            if entry is None:
+                continue
+            if not entry.mutable and entry.type != param.type:
+                block_errors.append(f'ERROR: Attempting to assign type {str(param.type)}'
+                                    f' to parameter "{prefix}{param.name}" which is of '
+                                    f'type {str(entry.type)}')
+                continue
+            entry.validate(param, prefix + param.name, block_errors)
+
+        if key is not None:
+            if len(self.cache_) >= SCHEMA_CACHE_SIZE:
+                self.cache_.clear()
+            self.cache_[key] = block_errors
+        errors += block_errors
+        return errors
@@ -1,60 +1,379 @@
 from .TFCObject import TFCObject
-from .InputParameters import Parameter, InputParameters
+from .InputParameters import Parameter, ParameterType, InputParameters
+from .ParameterSchema import ParameterSchema
+from .LazyParameter import LazyParameter
 
-import json
-import yaml
+import time
+import contextlib
+import importlib
+
+PROFILE_PHASES = ["getInputParameters", "assignParameters", "constructor"]
+
+# Entry-point group under which packages can provide PyFactory types, e.g. in
+# pyproject.toml:
+#   [project.entry-points."tfc_pyfactory.objects"]
+#   MyCheck = "my_checks.MyCheck:MyCheck"
+ENTRY_POINT_GROUP = "tfc_pyfactory.objects"
 
 class PyFactory:
     registered_objects_: dict[str, TFCObject] = {}
+    # Types registered by dotted path, imported on first use
+    lazy_objects_: dict[str, str] = {}
+    plugins_discovered_: bool = False
+    # Compiled input parameter schemas by class, see getSchema
+    schemas_: dict[type, ParameterSchema] = {}
+
+    # Opt-in profiling of object construction, see enableProfiling
+    profiling_: bool = False
+    profile_stats_: dict[str, dict] = {}
+    profiler_ = None
+    profile_depth_: int = 0
 
     @staticmethod
     def register(obj, type_name):
         PyFactory.registered_objects_[type_name] = obj
+        PyFactory.lazy_objects_.pop(type_name, None)
+
+    @staticmethod
+    def registerLazy(type_name: str, dotted_path: str) -> None:
+        """Registers a type by the path of its class, "package.module.Class" or
+        "package.module:Class". The module is only imported when the first
+        object of the type is made."""
+        if type_name in PyFactory.registered_objects_:
+            return
+        PyFactory.lazy_objects_[type_name] = dotted_path
+
+    @staticmethod
+    def getSchema(obj, valid_params: InputParameters) -> ParameterSchema:
+        """Returns the compiled schema of a class, compiling it from
+        valid_params (the result of its getInputParameters) on first use.
+        Classes whose input parameters change at runtime must call
+        clearSchemaCache after such a change."""
+        schema = PyFactory.schemas_.get(obj)
+        if schema is None:
+            schema = ParameterSchema.compile(valid_params)
+            PyFactory.schemas_[obj] = schema
+        return schema
+
+    @staticmethod
+    def clearSchemaCache() -> None:
+        PyFactory.schemas_ = {}
+
+    @staticmethod
+    def _assignParameters(obj, name: str, valid_params: InputParameters,
+                          params: Parameter) -> None:
+        """Validates params against the schema of obj and assigns them."""
+        errors = PyFactory.getSchema(obj, valid_params).validate(params)
+        if len(errors) > 0:
+            raise RuntimeError("\033[31mERROR: Assigning parameters for object \"" +
+                  name + "\"\n" + "\n".join(errors) + "\033[0m")
+        valid_params.assignParameters(params, check=False)
+
+    @staticmethod
+    def discoverPlugins() -> None:
+        """Lazily registers the types advertised by installed packages under the
+        tfc_pyfactory.objects entry-point group. Nothing is imported until an
+        object of such a type is made. Types registered otherwise take
+        precedence. Discovery happens once, on the first request for an
+        unknown type or for the list of types."""
+        if PyFactory.plugins_discovered_:
+            return
+        PyFactory.plugins_discovered_ = True
+
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            if not PyFactory.isRegistered(entry_point.name):
+                PyFactory.registerLazy(entry_point.name, entry_point.value)
+
+    @staticmethod
+    def isRegistered(type_name: str) -> bool:
+        return type_name in PyFactory.registered_objects_ or \
+               type_name in PyFactory.lazy_objects_
+
+    @staticmethod
+    def registeredTypes() -> list[str]:
+        """Returns the sorted names of all registered types, including those
+        of plugins."""
+        PyFactory.discoverPlugins()
+        return sorted(set(PyFactory.registered_objects_) | set(PyFactory.lazy_objects_))
+
+    @staticmethod
+    def describeType(type_name: str) -> str:
+        """Returns a description of the input parameters of a type."""
+        obj = PyFactory.getRegisteredObject(type_name)
+        valid_params = obj.getInputParameters()
+
+        lines = [f"{type_name} ({obj.__module__}.{obj.__name__})"]
+        for param in valid_params.sub_params:
+            doc_string = ""
+            attributes = []
+            for tag in valid_params.tags.get(param.name, []):
+                if tag.tag_name == "doc_string":
+                    doc_string = tag.value
+                elif tag.tag_name == "required":
+                    attributes.append("required")
+                elif tag.tag_name == "optional":
+                    attributes.append(f"default={param}")
+                elif tag.tag_name == "element_type":
+                    attributes.append(f"elements={ParameterType(tag.value).name}")
+                elif tag.tag_name == "range" or tag.tag_name == "enum":
+                    attributes.append(f"{tag.tag_name}={tag.value}")
+                else:
+                    attributes.append(tag.tag_name)
+            lines.append(f"  {param.name} : {param.type.name} "
+                         f"[{', '.join(attributes)}]")
+            if doc_string != "":
+                lines.append(f"      {doc_string}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def getRegisteredObject(type_name: str):
+        """Returns the class registered for a type, importing it if it was
+        registered lazily."""
+        if type_name in PyFactory.registered_objects_:
+            return PyFactory.registered_objects_[type_name]
+
+        if not type_name in PyFactory.lazy_objects_:
+            PyFactory.discoverPlugins()
+        if not type_name in PyFactory.lazy_objects_:
+            raise RuntimeError("Object \"" + type_name +
+                               "\" is not a registered object")
+
+        dotted_path = PyFactory.lazy_objects_[type_name]
+        if ":" in dotted_path:
+            module_name, class_name = dotted_path.split(":", 1)
+        else:
+            module_name, _, class_name = dotted_path.rpartition(".")
+        try:
+            module = importlib.import_module(module_name)
+            obj = getattr(module, class_name)
+        except (ImportError, AttributeError) as ex:
+            raise RuntimeError("\033[31mERROR: Could not load object \"" + type_name +
+                               "\" from \"" + dotted_path + "\"\n" + ex.__str__() +
+                               "\033[0m")
+
+        PyFactory.register(obj, type_name)
+        return obj
+
+    @staticmethod
+    def enableProfiling(use_cprofile: bool = False) -> None:
+        """Starts recording, per type, the number of objects made and the time
+        spent in getInputParameters, assignParameters and the constructor. The
+        times are inclusive, i.e. the constructor time of an object that makes
+        other objects includes theirs. If use_cprofile is true, makeObject is
+        also run under cProfile (see dumpProfile)."""
+        PyFactory.profiling_ = True
+        PyFactory.profile_stats_ = {}
+        PyFactory.profile_depth_ = 0
+        PyFactory.profiler_ = None
+        if use_cprofile:
+            import cProfile
+            PyFactory.profiler_ = cProfile.Profile()
+
+    @staticmethod
+    def disableProfiling() -> None:
+        PyFactory.profiling_ = False
+
+    @staticmethod
+    def profileReport(sort_by: str = "total") -> str:
+        """Returns a table of the recorded construction statistics, sorted in
+        descending order by "count", "total" or one of the phase names."""
+        def sortKey(item):
+            stats = item[1]
+            if sort_by == "count":
+                return stats["count"]
+            if sort_by == "total":
+                return sum(stats[phase] for phase in PROFILE_PHASES)
+            return stats[sort_by]
+
+        header = f"{'Type':30s} {'Count':>7s}" + \
+                 "".join(f" {phase:>19s}" for phase in PROFILE_PHASES) + \
+                 f" {'Total':>10s}"
+        lines = [header, "-" * len(header)]
+        for type_name, stats in sorted(PyFactory.profile_stats_.items(),
+                                       key=sortKey, reverse=True):
+            total = sum(stats[phase] for phase in PROFILE_PHASES)
+            lines.append(f"{type_name:30s} {stats['count']:7d}" +
+                         "".join(f" {stats[phase]:18.6f}s"
+                                 for phase in PROFILE_PHASES) +
+                         f" {total:9.6f}s")
+        return "\n".join(lines)
+
+    @staticmethod
+    def dumpProfile(file_name: str) -> None:
+        """Writes the cProfile statistics of makeObject, as loadable by pstats
+        or snakeviz."""
+        if PyFactory.profiler_ is None:
+            raise RuntimeError("\033[31mPyFactory profiling was not enabled with "
+                               "use_cprofile=True\033[0m")
+        PyFactory.profiler_.dump_stats(file_name)
 
     @staticmethod
     def makeObject(name: str, params: Parameter):
         type_name = params.getParam("type").getStringValue()
 
+        if params.frozen:
+            params = params.copy()
         params.addParameter("name", name)
 
-        # find the object
-        if not type_name in PyFactory.registered_objects_:
-            raise RuntimeError("Object \"" + type_name +
-                               "\" is not a registered object")
+        with PyFactory._profilePhases(type_name) as endPhase:
+            # find the object (the time spent importing a lazily registered
+            # type is included in the first phase)
+            obj = PyFactory.getRegisteredObject(type_name)
+            valid_params = obj.getInputParameters()
+            endPhase("getInputParameters")
 
-        obj = PyFactory.registered_objects_[type_name]
-        valid_params = obj.getInputParameters()
+            if not isinstance(valid_params, InputParameters):
+                raise RuntimeError("The getInputParameters method of object \"" + type_name +
+                                   "\" does not seem to return a type 'InputParameters'")
+
+            PyFactory._assignParameters(obj, name, valid_params, params)
+            endPhase("assignParameters")
+
+            new_obj = obj(valid_params)
+            endPhase("constructor")
+        return new_obj
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _profilePhases(type_name: str):
+        """Yields a function to call at the end of each phase of making an
+        object of a type, which adds the time since the previous phase to the
+        type's statistics. Does nothing unless profiling is enabled."""
+        if not PyFactory.profiling_:
+            yield lambda phase: None
+            return
+
+        profiler = PyFactory.profiler_
+        # Nested makeObject calls run under the outermost call's cProfile
+        if profiler is not None and PyFactory.profile_depth_ == 0:
+            profiler.enable()
+        PyFactory.profile_depth_ += 1
 
-        if not isinstance(valid_params, InputParameters):
-            raise RuntimeError("The getInputParameters method of object \"" + type_name +
-                               "\" does not seem to return a type 'InputParameters'")
+        phase_start = time.perf_counter()
+        def endPhase(phase: str) -> None:
+            nonlocal phase_start
+            stats = PyFactory.profile_stats_.get(type_name)
+            if stats is None:
+                stats = dict(count=0, **{name: 0.0 for name in PROFILE_PHASES})
+                PyFactory.profile_stats_[type_name] = stats
+            if phase == PROFILE_PHASES[0]:
+                stats["count"] += 1
+            now = time.perf_counter()
+            stats[phase] += now - phase_start
+            phase_start = now
 
         try:
-            valid_params.assignParameters(params)
-        except Exception as ex:
-            raise RuntimeError("\033[31mERROR: Assigning parameters for object \"" +
-                  name + "\"\n" + ex.__str__() + "\033[0m")
+            yield endPhase
+        finally:
+            PyFactory.profile_depth_ -= 1
+            if profiler is not None and PyFactory.profile_depth_ == 0:
+                profiler.disable()
+
+    @staticmethod
+    def makeObjects(specs, errors: list[str] = None) -> dict:
+        """Makes several objects at once. specs is a dict, or a list of
+        (name, spec) pairs, where each spec is a Parameter or a dict. The
+        input parameters of each type are obtained once and shared by all specs
+        of that type, and every spec is validated before any object is made.
+
+        Returns a dict of the objects by name, in the order of specs. All
+        errors are collected: if an errors list is supplied they are appended
+        to it and the objects that could be made are returned, otherwise a
+        single RuntimeError listing all of them is raised."""
+        if isinstance(specs, dict):
+            specs = specs.items()
+
+        error_list = [] if errors is None else errors
+        num_errors = len(error_list)
+
+        def assignError(name: str, message: str) -> str:
+            return "\033[31mERROR: Assigning parameters for object \"" + \
+                   name + "\"\n" + message + "\033[0m"
+
+        # Group the specs by type
+        entries = []
+        names = set()
+        prototypes: dict[str, InputParameters] = {}
+        for name, spec in specs:
+            if name in names:
+                error_list.append(f"\033[31mERROR: Duplicate object name \"{name}\"\033[0m")
+                continue
+            names.add(name)
+            params = spec if isinstance(spec, Parameter) else LazyParameter("", spec)
+            try:
+                type_name = params.getParam("type").getStringValue()
+                obj = PyFactory.getRegisteredObject(type_name)
+            except Exception as ex:
+                error_list.append(assignError(name, ex.__str__()))
+                continue
+            entries.append((name, type_name, obj, params))
+
+            if not type_name in prototypes:
+                prototypes[type_name] = None
+                valid_params = obj.getInputParameters()
+                if not isinstance(valid_params, InputParameters):
+                    error_list.append("The getInputParameters method of object \"" +
+                                      type_name +
+                                      "\" does not seem to return a type 'InputParameters'")
+                    continue
+                prototypes[type_name] = valid_params
 
-        return obj(valid_params)
+        # Validate all the specs before constructing anything. When profiling,
+        # the clone of the shared input parameters is recorded as the
+        # getInputParameters phase of each object.
+        validated = []
+        for name, type_name, obj, params in entries:
+            prototype = prototypes[type_name]
+            if prototype is None:
+                continue
+
+            if params.frozen:
+                params = params.copy()
+            params.addParameter("name", name)
+            with PyFactory._profilePhases(type_name) as endPhase:
+                valid_params = prototype.clone()
+                endPhase("getInputParameters")
+                spec_errors = PyFactory.getSchema(obj, prototype).validate(params)
+                if len(spec_errors) > 0:
+                    error_list.append(assignError(name, "\n".join(spec_errors)))
+                    continue
+                valid_params.assignParameters(params, check=False)
+                endPhase("assignParameters")
+            validated.append((name, type_name, obj, valid_params))
+
+        # Construct the objects
+        objects = {}
+        for name, type_name, obj, valid_params in validated:
+            try:
+                with PyFactory._profilePhases(type_name) as endPhase:
+                    objects[name] = obj(valid_params)
+                    endPhase("constructor")
+            except Exception as ex:
+                error_list.append("\033[31mERROR: Creating object \"" + name +
+                                  "\"\n" + ex.__str__() + "\033[0m")
+
+        if errors is None and len(error_list) > num_errors:
+            raise RuntimeError("\n".join(error_list))
+        return objects
 
     @staticmethod
-    def readYAML(file_path: str) -> list:
-        yaml_file = open(file_path)
-        yaml_dict = yaml.safe_load(yaml_file)
+    def readYAML(file_path: str) -> dict:
+        """Makes the objects described in a YAML file, where each top-level key
+        is the name of an object and its value the object's parameters. Returns
+        the objects by name."""
+        import yaml
 
-        obj_dict = {}
-        for obj_name in yaml_dict:
-            if obj_name in obj_dict:
-                print(f"\033[31mERROR: Duplicate object name \"{obj_name}\"\033[0m")
-                raise SyntaxError()
+        with open(file_path) as yaml_file:
+            yaml_dict = yaml.safe_load(yaml_file)
 
+        specs = []
+        for obj_name in yaml_dict:
             if not isinstance(obj_name, str):
                 raise SyntaxError(str(obj_name) + " should be a string")
             obj_params = yaml_dict[obj_name]
             if not isinstance(obj_params, dict):
                 raise SyntaxError("Value of object \"" + str(obj_name) + "\" should be a dict")
-            new_obj = PyFactory.makeObject(obj_name, Parameter("", obj_params))
-
-            obj_dict[obj_name] = new_obj
-
+            specs.append((obj_name, obj_params))
 
+        return PyFactory.makeObjects(specs)
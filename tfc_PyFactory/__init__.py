@@ -1,6 +1,12 @@
 from .InputParameters import *
 from .TFCObject import *
+from .ParameterSchema import *
+from .ParameterPool import *
+from .LazyParameter import *
+from .ParameterMerge import *
 from .PyFactory import *
 
-__all__ = ['InputParameters', 'Parameter',
-           'ParameterType', 'TFCObject', 'PyFactory']
+__all__ = ['InputParameters', 'InputParameterTag', 'Parameter',
+           'ParameterType', 'ParameterSchema', 'ParameterPool', 'LazyParameter',
+           'ParameterMerge', 'ListMergeStrategy',
+           'TFCObject', 'PyFactory']
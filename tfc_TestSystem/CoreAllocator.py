@@ -0,0 +1,113 @@
+"""Definition of CoreAllocator"""
+from __future__ import annotations
+import os
+import glob
+import shutil
+
+
+class CoreAllocator:
+    """Hands out disjoint sets of CPU ids to running tests. The available CPUs
+    are those of the affinity mask of the test system itself. Allocations are
+    kept within a single NUMA node whenever one has enough free CPUs (best fit,
+    lowest ids first) and otherwise spread over the nodes with the most free
+    CPUs.
+
+    Processes are bound with taskset when it is available, otherwise with
+    os.sched_setaffinity right after they have been launched."""
+
+    def __init__(self, cpus: list[int] = None) -> None:
+        if cpus is None:
+            cpus = sorted(os.sched_getaffinity(0))
+
+        self.cpus_: list[int] = sorted(cpus)
+        self.free_: set[int] = set(self.cpus_)
+        self.numa_nodes_: list[list[int]] = self._readNUMANodes()
+        self.taskset_ = shutil.which("taskset")
+
+    def _readNUMANodes(self) -> list[list[int]]:
+        """Reads the NUMA topology from sysfs, restricted to our CPUs. If it
+        is not available all CPUs are considered to be on one node."""
+        nodes = []
+        for node_dir in sorted(glob.glob("/sys/devices/system/node/node[0-9]*")):
+            try:
+                with open(node_dir + "/cpulist") as cpulist_file:
+                    node_cpus = parseCPUList(cpulist_file.read())
+            except OSError:
+                continue
+            node_cpus = [cpu for cpu in node_cpus if cpu in self.free_]
+            if len(node_cpus) > 0:
+                nodes.append(node_cpus)
+
+        covered = set(cpu for node in nodes for cpu in node)
+        leftover = [cpu for cpu in self.cpus_ if cpu not in covered]
+        if len(leftover) > 0:
+            nodes.append(leftover)
+
+        return nodes
+
+    def numCPUs(self) -> int:
+        return len(self.cpus_)
+
+    def numFree(self) -> int:
+        return len(self.free_)
+
+    def allocate(self, num_cpus: int) -> list[int]:
+        """Allocates a set of CPU ids. Returns None if not enough are free."""
+        if num_cpus > len(self.free_):
+            return None
+
+        node_free = [[cpu for cpu in node if cpu in self.free_]
+                     for node in self.numa_nodes_]
+
+        fitting = [free for free in node_free if len(free) >= num_cpus]
+        if len(fitting) > 0:
+            best = min(fitting, key=len)
+            cpus = best[:num_cpus]
+        else:
+            cpus = []
+            for free in sorted(node_free, key=len, reverse=True):
+                cpus += free[:num_cpus - len(cpus)]
+                if len(cpus) == num_cpus:
+                    break
+
+        self.free_.difference_update(cpus)
+        return sorted(cpus)
+
+    def release(self, cpus: list[int]) -> None:
+        """Returns CPU ids to the pool."""
+        self.free_.update(cpus)
+
+    def wrapArgs(self, args: list[str], cpus: list[int]) -> list[str]:
+        """Prefixes a command's argument list with taskset (if available) so
+        that the process, and everything it spawns, is bound to the cpus."""
+        if self.taskset_ is None or len(cpus) == 0:
+            return args
+        return [self.taskset_, "-c", formatCPUList(cpus)] + args
+
+    def bindProcess(self, pid: int, cpus: list[int]) -> None:
+        """Binds an already launched process when taskset is not available."""
+        if self.taskset_ is not None or len(cpus) == 0:
+            return
+        try:
+            os.sched_setaffinity(pid, cpus)
+        except OSError:
+            pass
+
+
+def parseCPUList(cpulist: str) -> list[int]:
+    """Parses a Linux cpulist string, e.g. "0-3,8,10-11"."""
+    cpus = []
+    for item in cpulist.strip().split(","):
+        if item == "":
+            continue
+        if "-" in item:
+            first, last = item.split("-")
+            cpus += list(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(item))
+    return cpus
+
+
+def formatCPUList(cpus: list[int]) -> str:
+    """Formats CPU ids as a comma separated list, e.g. "0,1,2,3"."""
+    return ",".join(str(cpu) for cpu in cpus)
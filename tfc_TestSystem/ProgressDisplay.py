@@ -0,0 +1,97 @@
+"""Definition of ProgressDisplay"""
+from __future__ import annotations
+import time
+
+
+def formatDuration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressDisplay:
+    """Shows the progress of a test run: tests done/running/queued, job slot
+    utilization, throughput and an ETA.
+
+    On a terminal the progress is a status line kept at the bottom of the
+    screen. While active, the display stands in for sys.stdout and clears the
+    status line before, and redraws it after, every line printed by the test
+    system. Otherwise a plain progress line is printed periodically."""
+
+    def __init__(self, stream, tty_interval: float = 0.2,
+                 plain_interval: float = 30.0) -> None:
+        self.stream_ = stream
+        self.is_tty_ = hasattr(stream, "isatty") and stream.isatty()
+        self.interval_ = tty_interval if self.is_tty_ else plain_interval
+        self.start_time_ = time.perf_counter()
+        self.last_draw_ = self.start_time_
+        self.status_ = ""
+        self.status_drawn_ = False
+
+    # ----------------------------------------------- stream interface
+    def write(self, text: str) -> int:
+        if self.status_drawn_:
+            self.stream_.write("\r\033[K")
+            self.status_drawn_ = False
+        self.stream_.write(text)
+        if text.endswith("\n") and self.status_ != "":
+            self.stream_.write(self.status_)
+            self.status_drawn_ = True
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream_.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self.stream_, name)
+
+    # ----------------------------------------------- progress
+    def due(self) -> bool:
+        """Whether it is time to update the progress (cheap to call)."""
+        return time.perf_counter() - self.last_draw_ >= self.interval_
+
+    def update(self, num_done: int, num_running: int, num_queued: int,
+               load: int, capacity: int, remaining_work: float = None) -> None:
+        """Updates the progress. remaining_work is the estimated number of
+        slot-seconds still needed by the running and queued tests, if known."""
+        now = time.perf_counter()
+        self.last_draw_ = now
+        elapsed = now - self.start_time_
+
+        total = num_done + num_running + num_queued
+        throughput = num_done / elapsed if elapsed > 0.0 else 0.0
+        utilization = 100.0 * load / capacity if capacity > 0 else 0.0
+
+        eta = None
+        if remaining_work is not None and capacity > 0:
+            eta = remaining_work / capacity
+        elif throughput > 0.0:
+            eta = (num_running + num_queued) / throughput
+
+        status = f"[{num_done}/{total}] running {num_running}, queued {num_queued}" \
+                 f" | slots {load}/{capacity} ({utilization:.0f}%)" \
+                 f" | {throughput:.2f} tests/s" \
+                 f" | elapsed {formatDuration(elapsed)}"
+        if eta is not None:
+            status += f", ETA {formatDuration(eta)}"
+
+        if self.is_tty_:
+            self.status_ = "\033[35m" + status + "\033[0m"
+            if self.status_drawn_:
+                self.stream_.write("\r\033[K")
+            self.stream_.write(self.status_)
+            self.status_drawn_ = True
+        else:
+            self.stream_.write("Progress: " + status + "\n")
+        self.stream_.flush()
+
+    def close(self) -> None:
+        """Removes the status line."""
+        if self.status_drawn_:
+            self.stream_.write("\r\033[K")
+            self.stream_.flush()
+        self.status_ = ""
+        self.status_drawn_ = False
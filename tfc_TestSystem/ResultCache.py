@@ -0,0 +1,45 @@
+"""Definition of ResultCache"""
+from __future__ import annotations
+import os
+import json
+import hashlib
+
+
+class ResultCache:
+    """A content-addressed store of passed test results. The key is derived
+    from a test's fingerprint (expanded spec including the check
+    configuration, resolved command line, executable binary, referenced input
+    files and gold files), the value holds the test's output file and status
+    annotations. Entries live in <directory>/<key[:2]>/<key>.json.
+
+    Only the output file is restored on a hit. Tests whose dependents consume
+    other files they produce should not be run with a cache."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory_ = directory
+        os.makedirs(self.directory_, exist_ok=True)
+
+    @staticmethod
+    def key(fingerprint: dict[str, str]) -> str:
+        text = ";".join(f"{name}={fingerprint[name]}" for name in sorted(fingerprint))
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def _fileName(self, key: str) -> str:
+        return os.path.join(self.directory_, key[:2], key + ".json")
+
+    def lookup(self, key: str) -> dict:
+        """Returns the entry for a key, or None."""
+        try:
+            with open(self._fileName(key)) as entry_file:
+                return json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, entry: dict) -> None:
+        file_name = self._fileName(key)
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+
+        temp_file_name = f"{file_name}.{os.getpid()}.tmp"
+        with open(temp_file_name, "w") as entry_file:
+            json.dump(entry, entry_file)
+        os.replace(temp_file_name, file_name)
@@ -5,6 +5,8 @@ import pathlib
 import math
 import subprocess
 import os
+import shlex
+import signal
 import time
 
 from tfc_PyFactory.InputParameters import InputParameters
@@ -18,18 +20,60 @@ PROJECT_ROOT_PATH = f'{TEST_SYSTEM_PATH}/../'
 import tfc_PyFactory
 from tfc_PyFactory import *
 
-from checks import *
+import checks  # Registers the check types (lazily)
+from CoreAllocator import formatCPUList
+from TestWorker import RemoteProcess
+
+# Seconds between terminating a timed out process group and killing it
+TIMEOUT_KILL_GRACE_PERIOD = 5.0
+
+# Characters that, when not quoted, require a command to be run by a shell
+SHELL_METACHARACTERS = "|&;<>()$`*?[]{}~#\n"
+
+
+def commandNeedsShell(cmd: str) -> bool:
+    """Determines whether a command line uses shell syntax (pipes,
+    redirection, command lists, variable expansion, globbing, environment
+    assignments) and can therefore not be executed directly."""
+    quote = None
+    for c in cmd:
+        if quote == "'":
+            if c == "'":
+                quote = None
+        elif quote == '"':
+            if c == '"':
+                quote = None
+            elif c in "$`\\":
+                return True
+        elif c in "'\"":
+            quote = c
+        elif c in SHELL_METACHARACTERS:
+            return True
+
+    try:
+        tokens = shlex.split(cmd)
+    except ValueError:
+        return True
+
+    # Leading environment assignments like "VAR=value exe"
+    if len(tokens) > 0 and "=" in tokens[0]:
+        return True
+
+    return False
 
 
 class TFCTestObject(TFCObject):
     """A Test object to organize tests. This object will load up a test with all
     the necessary bells-and-whistles. When executed by the test system, the test
     will execute the optional prerun script, after which a process will be
-    submitted according to the executable and arguments specified. The test
+    submitted according to the executable and arguments specified. The prerun
+    script is a phase of its own: it occupies the test's job slot and is polled
+    by the test system just like the test process. The test
     system will then continuously ping the test to ascertain it's completion
     status, which it does by calling it's checkProgress method. In this method
-    (if the test has completed) the test will execute its checks, run the
-    optional postrun script and mark itself completed.
+    (if the test has completed) the test will hand its checks and the optional
+    postrun script to the test system's executor, and mark itself completed
+    once those have finished.
 
     The working directory of the test is by default the directory in which it's
     configuration file lives. A relative offset may be added with the
@@ -42,23 +86,27 @@ class TFCTestObject(TFCObject):
         params.addRequiredParam("args", ParameterType.STRING,
                                 "Arguments to pass to the test program.")
         params.addRequiredParam("checks", ParameterType.ARRAY,
-                                "An array of check-inputs.")
+                                "An array of check-inputs.",
+                                [InputParameterTag("element_type", ParameterType.BLOCK)])
         params.addRequiredParam("project_root", ParameterType.STRING,
                                 "The path to the project root directory")
         params.addOptionalParam("disable_mpi", True,
                                 "Flag to suppress running the application "
                                 "via mpi.")
         params.addOptionalParam("num_procs", 1,
-                                "The number of mpi processes used.")
+                                "The number of mpi processes used.",
+                                [InputParameterTag("range", (1, None))])
         params.addOptionalParam("weight_class", "short",
-                                "The weight class short/intermediate/long")
+                                "The weight class short/intermediate/long",
+                                [InputParameterTag("enum", ["short", "intermediate", "long"])])
         params.addOptionalParam("outfileprefix", "",
                                 'Will default to the test name + .out, '
                                 'otherwise outfileprefix+.out.')
         params.addOptionalParam("skip", "",
                                 "If non-empty, will skip with this message.")
         params.addOptionalParam("dependencies", [""],
-                                "A list of dependent test names before this test can run.")
+                                "A list of dependent test names before this test can run.",
+                                [InputParameterTag("element_type", ParameterType.STRING)])
         params.addOptionalParam("prerun_script", "",
                                 "A shell script to run before the test is executed.")
         params.addOptionalParam("postrun_script", "",
@@ -71,6 +119,17 @@ class TFCTestObject(TFCObject):
                                 "the screen for failed tests")
         params.addOptionalParam("executable", "",
                                 "Executable to use instead of system wide default.")
+        params.addOptionalParam("timeout", 0.0,
+                                "Wall-clock time limit, in seconds, for the prerun script "
+                                "and the test. If zero, the test system's timeout for the "
+                                "test's weight class applies (if any). May be an "
+                                "integer.",
+                                [InputParameterTag("mutable"),
+                                 InputParameterTag("range", (0.0, None))])
+        params.addOptionalParam("use_shell", False,
+                                "If true, the test command and the pre/postrun scripts "
+                                "are always executed via the shell. Otherwise commands "
+                                "without shell syntax are executed directly.")
         params.addOptionalParam("copy_test", ["",""],
                                 "A way to copy a given test and run it with a slight change"
                                 "Input is a three item list specifying the name extension for the"
@@ -97,21 +156,35 @@ class TFCTestObject(TFCObject):
           params.getParam("relative_offset_workdir").getStringValue()
         self.debug_ = params.getParam("debug").getBooleanValue()
         self.executable_ = params.getParam("executable").getStringValue()
+        self.timeout_ = params.getParam("timeout").getFloatValue()
+        self.use_shell_ = params.getParam("use_shell").getBooleanValue()
         self.copy_test_ = params.getParam("copy_test")
 
         self.test_system_reference_ = None
+        self.spec_ = str(params)
+        self.fingerprint_: dict[str, str] = None
+        self.cached_result_: dict = None
 
         self.checks_: list[CheckBase] = []
         self._process_ = None
+        self._prerun_process_ = None
+        self._postrun_process_ = None
+        self._post_future_ = None
         self._time_start_ = time.perf_counter()
         self._time_end_ = time.perf_counter()
+        self._prerun_time_start_ = 0.0
+        self._prerun_time_end_ = 0.0
+        self._deadline_ = None
+        self.cpus_: list[int] = []
+        self.worker_ = None
+        self.trace_slots_: list[int] = []
+        self._kill_time_ = None
         self._command_ = ""
 
         check_inputs = params.getParam("checks")
-        for check_input in check_inputs:
-            id = str(len(self.checks_))
-            check = PyFactory.makeObject(id, check_input)
-            self.checks_.append(check)
+        check_specs = [(str(k), check_input)
+                       for k, check_input in enumerate(check_inputs.sub_params)]
+        self.checks_ = list(PyFactory.makeObjects(check_specs).values())
 
         pretty_name = os.path.relpath(self.name_, PROJECT_ROOT_PATH)
 
@@ -120,6 +193,14 @@ class TFCTestObject(TFCObject):
         self.ran_: bool = False
         self.submitted_: bool = False
         self.passed_: bool = False
+        self.timed_out_: bool = False
+        self.cancelled_: bool = False
+        self.dependency_failed_: bool = False
+        # Not run because its weight class is not allowed
+        self.filtered_: bool = False
+        self.annotations_: list[str] = []
+        self.error_code_: int = None
+        self.rusage_ = None
 
 
     def setTestSystemReference(self, ref):
@@ -128,10 +209,14 @@ class TFCTestObject(TFCObject):
         self.relative_offset_workdir_ = \
           self.keywordReplace(self.relative_offset_workdir_)
 
-    def keywordReplace(self, input) -> str:
+    def keywordReplace(self, input, in_slot: bool = True) -> str:
+        """Replaces the keywords ($TEST_NAME etc. and environment variables) in
+        a string. $CPU_LIST is empty unless in_slot, see _popen."""
         dir_, test_name = os.path.split(self.name_)
         output = input.replace("$TEST_NAME", test_name)
         output = output.replace("$PROJECT_ROOT", self.project_root_)
+        output = output.replace("$CPU_LIST",
+                                formatCPUList(self.cpus_ if in_slot else []))
 
         env_vars = self.test_system_reference_.env_vars_
 
@@ -150,40 +235,92 @@ class TFCTestObject(TFCObject):
         for dependency in self.dependencies_:
             dep_name = dependency.getStringValue()
             for test in tests:
-                test_name = test.name_
-                last_dash = test_name.rfind("/")
-                test_true_name = test_name if last_dash < 0 else test_name[last_dash+1:]
-
-                if test_true_name == dep_name and not test.ran_:
+                if test.trueName() == dep_name and not test.ran_:
                     return False
         return True
 
+    def failedDependency(self, tests: list[TFCTestObject]) -> str:
+        """Returns the name of a dependency, from the supplied tests-list,
+        that has run but did not pass. Dependencies that were not run (e.g.
+        filtered out by weight class) do not count. Returns an empty string if
+        there is none."""
+        for dependency in self.dependencies_:
+            dep_name = dependency.getStringValue()
+            for test in tests:
+                if test.trueName() == dep_name and test.submitted_ and \
+                   test.ran_ and not test.passed_:
+                    return dep_name
+        return ""
+
+    def skipForFailedDependency(self, dep_name: str) -> None:
+        """Marks the test to be skipped, and to fail, because a dependency
+        failed."""
+        self.skip_ = f"dependency {dep_name} failed"
+        self.dependency_failed_ = True
+
+    def cancel(self) -> None:
+        """Cancels the test if it is running. Its process groups are killed
+        and the test fails."""
+        if not self.submitted_ or self.ran_:
+            return
+        for process in [self._prerun_process_, self._process_]:
+            if process is not None and process.poll() is None:
+                self.cancelled_ = True
+                self._killProcessGroup(process, signal.SIGKILL)
+
+    def kill(self) -> None:
+        """Kills the process groups of the prerun script, command and postrun
+        script of the test that are still running, e.g. when the test system
+        is interrupted. Unlike cancel, the result of the test is not changed."""
+        for process in [self._prerun_process_, self._process_,
+                        self._postrun_process_]:
+            if process is not None and process.poll() is None:
+                self._killProcessGroup(process, signal.SIGKILL)
+
+    def trueName(self) -> str:
+        """Returns the name of the test without its directory, i.e. the name
+        used in the test file and in dependencies."""
+        last_dash = self.name_.rfind("/")
+        return self.name_ if last_dash < 0 else self.name_[last_dash+1:]
+
+    def totalTime(self) -> float:
+        """Returns the wall time taken by the prerun script and the test."""
+        time_taken = self._time_end_ - self._time_start_
+        if self.prerun_script_ != "" and self.skip_ == "":
+            time_taken += self._prerun_time_end_ - self._prerun_time_start_
+        return time_taken
+
     def submit(self, test_system) -> None:
-        """Submits the test to a process call"""
+        """Submits the test to a process call. If the test has a prerun script,
+        only the prerun script is launched here and the test itself is launched
+        from checkProgress once the prerun script has completed."""
         self.submitted_ = True
 
         dir_, filename_ = os.path.split(self.name_)
 
+        self._command_ = self.buildCommand(test_system)
+
+        self._time_start_ = time.perf_counter()
+
+        if self.skip_ != "":
+            return
+
+        timeout = self.effectiveTimeout(test_system)
+        if timeout > 0.0:
+            self._deadline_ = self._time_start_ + timeout
+
         if not self.prerun_script_ == "":
             script = self.prerun_script_
             script = self.keywordReplace(script)
-            preprocess = subprocess.Popen(script,
-                                        cwd=dir_,
-                                        shell=True,
-                                        stdout=subprocess.PIPE,
-                                        stderr=subprocess.PIPE,
-                                        universal_newlines=True)
 
-            out, err = preprocess.communicate()
-            error_code = preprocess.returncode
+            self._prerun_time_start_ = time.perf_counter()
+            self._prerun_process_ = self._popen(script, cwd=dir_)
+            return
 
-            if error_code != 0:
-                print('\033[31mERROR: Prerun script for test ' +
-                 f'{self.name_}:\n{script}\n failed with:\n' +
-                 f'{err}\n' +
-                 f'Output:\n{out}' +
-                 '\033[0m')
+        self._launch()
 
+    def buildCommand(self, test_system) -> str:
+        """Returns the command line of the test, with keywords replaced."""
         cmd = ""
         if not self.disable_mpi_:
             cmd += "mpiexec "
@@ -195,61 +332,274 @@ class TFCTestObject(TFCObject):
         cmd += test_system.default_args_ + " "
         cmd += self.args_ + " "
 
-        cmd = self.keywordReplace(cmd)
-
-        self._command_ = cmd
+        return self.keywordReplace(cmd)
 
+    def workDirectory(self) -> str:
+        """Returns the directory in which the test is executed."""
+        dir_, filename_ = os.path.split(self.name_)
+        return dir_ + "/" + self.relative_offset_workdir_
+
+    def effectiveTimeout(self, test_system) -> float:
+        """Returns the timeout, in seconds, that applies to this test. Zero
+        means no timeout."""
+        if self.timeout_ > 0.0:
+            return self.timeout_
+        return float(test_system.timeouts_.get(self.weight_class_, 0.0))
+
+    def submitFromCache(self, test_system, cached_result: dict) -> None:
+        """Submits the test with a result from the result cache. Nothing is
+        executed; checkProgress restores the cached output file and reports
+        the test as passed."""
+        self.submitted_ = True
+        self.cached_result_ = cached_result
+        self._command_ = self.buildCommand(test_system)
         self._time_start_ = time.perf_counter()
 
-        if self.skip_ != "":
-            return
+    def outFileName(self) -> str:
+        """Returns the name of the file holding the command and output."""
+        dir_, testname_ = os.path.split(self.name_)
+        prefix = testname_ if self.outfileprefix_ == "" else self.outfileprefix_
+        return dir_ + f"/out/{prefix}.cout"
+
+    def _launch(self) -> None:
+        """Launches the test process proper."""
+        dir_, filename_ = os.path.split(self.name_)
 
         # Make the output directory
         if not os.path.isdir(dir_+"/out"):
                     os.mkdir(dir_+"/out")
 
-        self._process_ = subprocess.Popen(cmd,
-                                        cwd=dir_ + "/" +
-                                            self.relative_offset_workdir_,
-                                        shell=True,
-                                        stdout=subprocess.PIPE,
-                                        stderr=subprocess.PIPE,
-                                        universal_newlines=True)
+        self._time_start_ = time.perf_counter()
+
+        self._process_ = self._popen(self._command_,
+                                     cwd=dir_ + "/" + self.relative_offset_workdir_)
+
+    def _popen(self, cmd: str, cwd: str, in_slot: bool = True) -> subprocess.Popen:
+        """Launches a command. Unless shell mode is requested (by the test or
+        the test system) or the command uses shell syntax, the command is
+        tokenized and the program executed directly, without a /bin/sh.
+        A command run in the test's job slot (in_slot) is bound to the CPUs
+        allocated to the test, if any, and executed by the test's worker, if
+        it has been assigned one. Other commands (the postrun script, which
+        runs after the slot has been released) are executed locally, unbound."""
+        use_shell = self.use_shell_ or \
+                    self.test_system_reference_.use_shell_ or \
+                    commandNeedsShell(cmd)
+
+        if in_slot and self.worker_ is not None:
+            args = ["/bin/sh", "-c", cmd] if use_shell else shlex.split(cmd)
+            return self.test_system_reference_.worker_pool_.launch(
+                self.worker_, args, cwd)
+
+        core_allocator = self.test_system_reference_.core_allocator_
+        if not in_slot:
+            core_allocator = None
+
+        process = None
+        if not use_shell:
+            args = shlex.split(cmd)
+            if core_allocator is not None:
+                args = core_allocator.wrapArgs(args, self.cpus_)
+            try:
+                process = subprocess.Popen(args,
+                                           cwd=cwd,
+                                           shell=False,
+                                           start_new_session=True,
+                                           stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE,
+                                           universal_newlines=True)
+            except OSError:
+                # Let the shell report a missing/non-executable program the
+                # way it always has (exit code 127/126 plus a message)
+                pass
+
+        if process is None:
+            args = ["/bin/sh", "-c", cmd]
+            if core_allocator is not None:
+                args = core_allocator.wrapArgs(args, self.cpus_)
+            process = subprocess.Popen(args,
+                                       cwd=cwd,
+                                       shell=False,
+                                       start_new_session=True,
+                                       stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE,
+                                       universal_newlines=True)
+
+        if core_allocator is not None:
+            core_allocator.bindProcess(process.pid, self.cpus_)
+
+        return process
+
+    def _pollProcess(self, process: subprocess.Popen):
+        """Like process.poll(), but for local processes the child is reaped
+        with os.wait4 so that its resource usage (including that of the
+        descendants it waited for) is kept in rusage_."""
+        if not isinstance(process, subprocess.Popen) or process.returncode is not None:
+            return process.poll()
+        try:
+            pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+        except ChildProcessError:
+            return process.poll()
+        if pid == 0:
+            return None
+
+        process.returncode = os.waitstatus_to_exitcode(status)
+        self.rusage_ = rusage
+        return process.returncode
+
+    def status(self) -> str:
+        """Returns the final status of the test: passed, failed, skipped,
+        timeout, cancelled, cached or filtered."""
+        if self.filtered_:
+            return "filtered"
+        if self.skip_ != "" and not self.dependency_failed_:
+            return "skipped"
+        if self.timed_out_:
+            return "timeout"
+        if self.cancelled_:
+            return "cancelled"
+        if self.cached_result_ is not None:
+            return "cached"
+        return "passed" if self.passed_ else "failed"
+
+    @staticmethod
+    def _killProcessGroup(process: subprocess.Popen, sig: int) -> None:
+        """Sends a signal to the whole process group (session) of a process
+        launched by _popen, thereby including e.g. the ranks of mpiexec."""
+        if isinstance(process, RemoteProcess):
+            process.killGroup(sig)
+            return
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _enforceTimeout(self, process: subprocess.Popen) -> None:
+        """Terminates the process group of a still running process once the
+        deadline has passed, and kills it if it has not exited after a grace
+        period."""
+        if self._deadline_ is None:
+            return
+
+        now = time.perf_counter()
+        if self._kill_time_ is None:
+            if now > self._deadline_:
+                self.timed_out_ = True
+                self._kill_time_ = now + TIMEOUT_KILL_GRACE_PERIOD
+                self._killProcessGroup(process, signal.SIGTERM)
+        elif now > self._kill_time_:
+            self._kill_time_ = now + TIMEOUT_KILL_GRACE_PERIOD
+            self._killProcessGroup(process, signal.SIGKILL)
+
+    def _checkPrerunProgress(self) -> bool:
+        """Polls the prerun script. Returns True while it is still running.
+        Once it has completed, reports a failure (if any) and launches the
+        test process, unless the prerun script timed out."""
+        if self._prerun_process_.poll() is None:
+            self._enforceTimeout(self._prerun_process_)
+            return True
+
+        out, err = self._prerun_process_.communicate()
+        error_code = self._prerun_process_.returncode
+
+        self._prerun_time_end_ = time.perf_counter()
+        self._prerun_process_ = None
+
+        if error_code != 0:
+            script = self.keywordReplace(self.prerun_script_)
+            print('\033[31mERROR: Prerun script for test ' +
+             f'{self.name_}:\n{script}\n failed with:\n' +
+             f'{err}\n' +
+             f'Output:\n{out}' +
+             '\033[0m')
+
+        if not self.timed_out_ and not self.cancelled_:
+            self._launch()
+        return False
 
 
     def checkProgress(self, test_system) -> str:
         """Checks whether the process is running and returns 'Running' if it is.
-        If it is not running anymore the checks will be executed."""
+        Once the process has completed, the post-completion work (writing the
+        output file, executing the checks and running the postrun script) is
+        handed to the test system's executor and 'PostProcessing' is returned
+        until it finishes. The status line is printed from the calling (scheduler)
+        thread so that console output remains ordered."""
 
         if self.ran_:
             return "Done"
 
-        error_code = 0
-        out_file_name = ""
-        dir_, testname_ = os.path.split(self.name_)
-        annotations = []
-        cntl_char_pad = 0
+        if self._post_future_ is not None:
+            if not self._post_future_.done():
+                return "PostProcessing"
 
-        if self.skip_ == "":
-            if self._process_.poll() is not None:
+            # Re-raises, on the scheduler thread, any exception from the worker
+            annotations, messages = self._post_future_.result()
+            self.annotations_ = annotations
 
-                out, err = self._process_.communicate()
-                error_code = self._process_.returncode
+            print(self._statusLine(test_system, annotations))
+            for message in messages:
+                print(message)
 
-                self._time_end_ = time.perf_counter()
+            self.ran_ = True
+            return "Done"
 
-                prefix = testname_ if self.outfileprefix_ == "" else self.outfileprefix_
+        if self._prerun_process_ is not None:
+            if self._checkPrerunProgress():
+                return "Running"
 
-                out_file_name = dir_ + f"/out/{prefix}.cout"
-                file = open(out_file_name, "w")
-                file.write(self._command_ + "\n")
-                file.write(out + "\n")
-                file.write(err + "\n")
-                file.close()
-                # self.ran_ = True
-            else:
+        out = ""
+        err = ""
+        error_code = 0
+        if self._process_ is not None:
+            if self._pollProcess(self._process_) is None:
+                self._enforceTimeout(self._process_)
                 return "Running"
 
+            out, err = self._process_.communicate()
+            error_code = self._process_.returncode
+
+        self._time_end_ = time.perf_counter()
+
+        self._post_future_ = test_system.executor_.submit(
+            self._postProcess, test_system, out, err, error_code)
+
+        return "PostProcessing"
+
+    def _postProcess(self, test_system, out: str, err: str, error_code: int):
+        """Executes the post-completion work of the test. This runs on a worker
+        thread of the test system and therefore does not print anything.
+        Returns the annotations for the status line and a list of messages
+        to be printed after it."""
+        dir_, testname_ = os.path.split(self.name_)
+        annotations = []
+        messages = []
+        tracer = test_system.tracer_
+        post_start = time.perf_counter()
+
+        if self.cached_result_ is not None:
+            os.makedirs(dir_ + "/out", exist_ok=True)
+            with open(self.outFileName(), "w") as file:
+                file.write(self.cached_result_["output"])
+
+            self.passed_ = True
+            annotations += self.cached_result_["annotations"]
+            annotations.append("cached")
+            return annotations, messages
+
+        if self.skip_ == "":
+            # The output directory is made by _launch, which is not reached if
+            # the prerun script timed out or the test was cancelled during it
+            os.makedirs(dir_ + "/out", exist_ok=True)
+            out_file_name = self.outFileName()
+            file = open(out_file_name, "w")
+            file.write(self._command_ + "\n")
+            file.write(out + "\n")
+            file.write(err + "\n")
+            file.close()
+
+            self.error_code_ = error_code
+
             self.passed_ = True
             test_config = dict(
                 test = self,
@@ -262,15 +612,67 @@ class TFCTestObject(TFCObject):
             )
 
             for check in self.checks_:
+                check_start = time.perf_counter()
                 result = check.executeCheck(test_config, annotations)
+                if tracer is not None:
+                    tracer.complete(type(check).__name__, "check", check_start,
+                                    time.perf_counter(),
+                                    args=dict(test=self.name_, passed=result))
                 if not result:
                     self.passed_ = False
+
+            if self.timed_out_:
+                self.passed_ = False
+                annotations.append("timeout")
+            if self.cancelled_:
+                self.passed_ = False
+                annotations.append("cancelled")
         else: # skipped
-            self._time_end_ = time.perf_counter()
-            self.passed_ = True
-            # self.ran_ = True
+            self.passed_ = not self.dependency_failed_
             annotations.append( f"skipped:{self.skip_}" )
 
+        if not self.postrun_script_ == "":
+            script = self.postrun_script_
+            script = self.keywordReplace(script, in_slot=False)
+            postrun_start = time.perf_counter()
+            postprocess = self._popen(script, cwd=dir_, in_slot=False)
+            self._postrun_process_ = postprocess
+
+            timeout = self.effectiveTimeout(test_system)
+            try:
+                out, err = postprocess.communicate(
+                    timeout=timeout if timeout > 0.0 else None)
+            except subprocess.TimeoutExpired:
+                self._killProcessGroup(postprocess, signal.SIGKILL)
+                out, err = postprocess.communicate()
+                messages.append('\033[31mERROR: Postrun script for test ' +
+                 f'{self.name_} timed out after {timeout}s\033[0m')
+            error_code = postprocess.returncode
+            if tracer is not None:
+                tracer.complete("postrun", "script", postrun_start,
+                                time.perf_counter(),
+                                args=dict(test=self.name_, exit_code=error_code))
+
+            if error_code != 0:
+                messages.append('\033[31mERROR: Postrun script for test ' +
+                 f'{self.name_}:\n{script}\n failed with:\n' +
+                 f'{err}\n' +
+                 f'Output:\n{out}' +
+                 '\033[0m')
+            if self.debug_:
+                messages.append("DEBUG: use postrun_script to print useful output here")
+                messages.append(out)
+
+        if tracer is not None:
+            tracer.complete(f"post-process {testname_}", "post-process", post_start,
+                            time.perf_counter(), args=dict(test=self.name_))
+
+        return annotations, messages
+
+    def _statusLine(self, test_system, annotations: list[str]) -> str:
+        """Formats the Pass/Fail status line of the test."""
+        cntl_char_pad = 0
+
         max_num_procs = test_system.max_num_procs_
         pcount_width = int(math.floor(math.log10(max_num_procs)))+1
 
@@ -293,39 +695,11 @@ class TFCTestObject(TFCObject):
         width = max(width, 0)
 
         suffix = '.' * width + suffix + f" {time_taken:.1g}s"
+        if self.prerun_script_ != "" and self.skip_ == "":
+            prerun_time_taken = self._prerun_time_end_ - self._prerun_time_start_
+            suffix += f" (prerun {prerun_time_taken:.1g}s)"
 
-        message = prefix + pretty_name + suffix
-
-        print(message)
-
-        # if not os.path.exists():
-
-        if not self.postrun_script_ == "":
-            script = self.postrun_script_
-            script = self.keywordReplace(script)
-            preprocess = subprocess.Popen(script,
-                                        cwd=dir_,
-                                        shell=True,
-                                        stdout=subprocess.PIPE,
-                                        stderr=subprocess.PIPE,
-                                        universal_newlines=True)
-
-            out, err = preprocess.communicate()
-            error_code = preprocess.returncode
-
-            if error_code != 0:
-                print('\033[31mERROR: Postrun script for test ' +
-                 f'{self.name_}:\n{script}\n failed with:\n' +
-                 f'{err}\n' +
-                 f'Output:\n{out}' +
-                 '\033[0m')
-            if self.debug_:
-                print("DEBUG: use postrun_script to print useful output here")
-                print(out)
-
-        self.ran_ = True
-
-        return "Done"
+        return prefix + pretty_name + suffix
 
 
 PyFactory.register(TFCTestObject, "TFCTestObject")
@@ -12,11 +12,23 @@ import tfc_PyFactory
 from tfc_PyFactory import *
 import TFCTestObject
 from TFCTestObject import *
+from CoreAllocator import CoreAllocator
+from TestWorker import TestWorkerPool
+from TestHistory import TestHistory
+from TestFingerprint import FileHasher, fingerprintTest
+from ResultCache import ResultCache
+from TestReporters import JSONLinesReporter, JUnitXMLReporter
+from ProgressDisplay import ProgressDisplay
+from TraceRecorder import TraceRecorder
 
 import os
 import yaml
 
 import time
+import signal
+import statistics
+import threading
+import concurrent.futures
 
 # ===================================================================
 class TFCTestSystem(TFCObject):
@@ -35,7 +47,8 @@ class TFCTestSystem(TFCObject):
                                 "The executable to use for the tests (May be overridden"
                                 " from the configuration file).")
         params.addOptionalParam("num_jobs", int(4),
-                                "The number of jobs that may run at the same time.")
+                                "The number of jobs that may run at the same time.",
+                                [InputParameterTag("range", (1, None))])
         params.addOptionalParam("weights", int(1),
                                 "Weight classes to allow. "
                                 "0=None, "
@@ -45,9 +58,65 @@ class TFCTestSystem(TFCObject):
                                 "4=Long, "
                                 "5=Long+Short, "
                                 "6=Long+Intermediate, "
-                                "7=All")
+                                "7=All",
+                                [InputParameterTag("range", (0, 7))])
         params.addOptionalParam("config_file", "TestSystemCONFIG.yaml",
                                 "The name of the default config file")
+        params.addOptionalParam("bind_cores", False,
+                                "If true, each running test is bound to a disjoint set "
+                                "of num_procs CPUs (NUMA-aware). The CPU ids are also "
+                                "available to test arguments as $CPU_LIST, e.g. for MPI "
+                                "binding flags. Postrun scripts run after the CPUs are "
+                                "released, so they are not bound and $CPU_LIST is "
+                                "empty in them.")
+        params.addOptionalParam("worker_commands", [],
+                                "Shell commands that each start a worker process "
+                                "(TestSystemEXE.py --worker), locally or on another "
+                                "host. If supplied, test commands are executed by the "
+                                "workers and num_jobs is replaced by their total "
+                                "number of slots.",
+                                [InputParameterTag("element_type", ParameterType.STRING)])
+        params.addOptionalParam("shard", "",
+                                'If non-empty, of the form "i/N", only the i-th '
+                                "(1-based) of N balanced shards of the tests is run. "
+                                "Tests and their dependencies stay in the same shard.")
+        params.addOptionalParam("rerun", False,
+                                "If true, only the tests that failed in the last run, "
+                                "have no recorded result, or whose spec, input files, "
+                                "gold files or executable changed are run, together "
+                                "with the tests depending on them.")
+        params.addOptionalParam("cache_dir", "",
+                                "If non-empty, a directory holding a cache of passed "
+                                "test results keyed by the test's fingerprint. Tests "
+                                "with a cached result are not executed.")
+        params.addOptionalParam("max_failures", 0,
+                                "If non-zero, no new tests are started once this many "
+                                "tests have failed.",
+                                [InputParameterTag("range", (0, None))])
+        params.addOptionalParam("cancel_running", False,
+                                "If true, running tests are killed once max_failures "
+                                "is reached, rather than allowed to complete.")
+        params.addOptionalParam("json_report", "",
+                                "If non-empty, a file to which one JSON record per test "
+                                "is streamed as tests finish.")
+        params.addOptionalParam("junit_report", "",
+                                "If non-empty, a JUnit XML file written once all tests "
+                                "have finished.")
+        params.addOptionalParam("progress",
+                                hasattr(sys.stdout, "isatty") and sys.stdout.isatty(),
+                                "If true, shows a live status line (tests done/running/"
+                                "queued, slot utilization, throughput, ETA) on a "
+                                "terminal, or prints it periodically otherwise. "
+                                "Defaults to true only if stdout is a terminal.")
+        params.addOptionalParam("trace_file", "",
+                                "If non-empty, a Chrome trace-event JSON file (viewable "
+                                "in chrome://tracing or Perfetto) with the timeline of "
+                                "the scheduler, each job slot and the post-processing "
+                                "threads.")
+        params.addOptionalParam("history_file", "",
+                                "File in which the results of previous runs are kept. "
+                                "Defaults to .tfc_test_history.json in the test "
+                                "directory. It is not updated by shard runs.")
 
         return params
 
@@ -62,11 +131,29 @@ class TFCTestSystem(TFCObject):
         self.num_jobs_ = params.getParam("num_jobs").getIntegerValue()
         self.weights_ = params.getParam("weights").getIntegerValue()
         self.config_file_ = params.getParam("config_file").getStringValue()
+        self.bind_cores_ = params.getParam("bind_cores").getBooleanValue()
+        self.worker_commands_ = [command.getStringValue() for command in
+                                 params.getParam("worker_commands")]
+        self.shard_ = params.getParam("shard").getStringValue()
+        self.rerun_ = params.getParam("rerun").getBooleanValue()
+        self.cache_dir_ = params.getParam("cache_dir").getStringValue()
+        self.max_failures_ = params.getParam("max_failures").getIntegerValue()
+        self.cancel_running_ = params.getParam("cancel_running").getBooleanValue()
+        self.json_report_ = params.getParam("json_report").getStringValue()
+        self.junit_report_ = params.getParam("junit_report").getStringValue()
+        self.progress_ = params.getParam("progress").getBooleanValue()
+        self.trace_file_ = params.getParam("trace_file").getStringValue()
+        self.history_file_ = params.getParam("history_file").getStringValue()
+        if self.history_file_ == "":
+            self.history_file_ = os.path.join(self.directory_,
+                                              ".tfc_test_history.json")
 
         # Config file options
         self.print_width_ = 120
         self.default_args_ = ""
         self.env_vars_ = []
+        self.use_shell_ = False
+        self.timeouts_: dict[str, float] = {}
 
         self.project_root_ = os.path.abspath(file_path + "/../../../")
         print("Project-root", self.project_root_)
@@ -89,10 +176,26 @@ class TFCTestSystem(TFCObject):
         self.max_num_procs_ = 1
 
         self.tests_: list[TFCTestObject] = []
+        self.history_ = TestHistory(self.history_file_)
+        self.file_hasher_ = FileHasher()
+        self.result_cache_: ResultCache = None
+        if self.cache_dir_ != "":
+            self.result_cache_ = ResultCache(self.cache_dir_)
+        self.executor_: concurrent.futures.Executor = None
+
+        self.core_allocator_: CoreAllocator = None
+        if self.bind_cores_:
+            self.core_allocator_ = CoreAllocator()
+
+        self.worker_pool_: TestWorkerPool = None
+        self.tracer_: TraceRecorder = None
 
         test_files = self._recursiveFindTestListFiles(self.directory_, True)
         self._parseTestFiles(test_files=test_files)
 
+        if self.shard_ != "":
+            self._applyShard()
+
         for test in self.tests_:
             self.max_num_procs_ = max(self.max_num_procs_, test.num_procs_)
 
@@ -110,10 +213,20 @@ class TFCTestSystem(TFCObject):
                         self.default_args_ = yaml_dict[param]
                     if param == "env_vars":
                         self.env_vars_ = yaml_dict[param]
+                    if param == "use_shell":
+                        self.use_shell_ = bool(yaml_dict[param])
+                    if param == "timeouts":
+                        self.timeouts_ = yaml_dict[param]
+
+        if self.rerun_:
+            self._applyRerunFilter()
 
         print("\n***** TFCTestSystem created *****")
         print(f"  Main executable: {self.executable_}")
         print(f"  Number of jobs : {self.num_jobs_}")
+        if self.core_allocator_ is not None:
+            print(f"  Bound CPUs     : {self.core_allocator_.numCPUs()} in "
+                  f"{len(self.core_allocator_.numa_nodes_)} NUMA node(s)")
         print(f"  Weight classes : {self.weight_classes_allowed_}")
         print()
 
@@ -138,7 +251,11 @@ class TFCTestSystem(TFCObject):
 
 
     def _parseTestFiles(self, test_files: list[str]):
-        """Parses each *tests*.yaml file and creates the tests."""
+        """Parses each *tests*.yaml file and creates the tests. The parameters
+        of all tests are interned in one ParameterPool, so that identical
+        sub-trees (e.g. the checks of tests from the same template) are shared
+        rather than duplicated per test."""
+        parameter_pool = ParameterPool()
         for file_name in test_files:
             pretty_name = os.path.relpath(file_name, PROJECT_ROOT_PATH)
             print("Parsing " + pretty_name)
@@ -163,6 +280,7 @@ class TFCTestSystem(TFCObject):
             # ============================== Expand all templates and special keys
             executable = ""
             expanded_yaml_dict = {}
+            expanded_templates = {}
             for test_name in yaml_dict:
                 temp_dict = yaml_dict[test_name]
 
@@ -171,24 +289,9 @@ class TFCTestSystem(TFCObject):
                     executable = self.project_root_ + "/" + yaml_dict[test_name]
                     continue
 
-                # Init the test's parameters dictionary
-                test_dict = {}
-
-                # Set to a template if needed
-                if "from_template" in temp_dict:
-                    template_name = temp_dict["from_template"]
-                    if not template_name in templates:
-                        print(f"\033[31mWARNING: Error test \"{test_name}\": " +
-                        f'template name "{template_name} not found."\033[0m')
-                        continue
-                    else:
-                        test_dict = templates[template_name].copy()
-
-                # Copy/overwrite other original parameters
-                for param_name in temp_dict:
-                    if param_name == "from_template": continue
-
-                    test_dict[param_name] = temp_dict[param_name]
+                test_dict = self._expandTemplates(test_name, temp_dict, templates,
+                                                  expanded_templates, parameter_pool)
+                if test_dict is None: continue
 
                 expanded_yaml_dict[test_name] = test_dict
 
@@ -258,7 +361,8 @@ class TFCTestSystem(TFCObject):
                     test_dict["executable"] = executable
 
                 try:
-                    test = PyFactory.makeObject(test_true_name, Parameter("", test_dict))
+                    test = PyFactory.makeObject(test_true_name,
+                                                parameter_pool.makeBlock(test_dict))
                     test.setTestSystemReference(self)
                     self.tests_.append(test)
                 except Exception as ex:
@@ -266,6 +370,285 @@ class TFCTestSystem(TFCObject):
                           ex.__str__())
 
 
+    def _expandTemplates(self, test_name: str, temp_dict: dict, templates: dict,
+                         expanded_templates: dict, parameter_pool: ParameterPool,
+                         chain: tuple = ()):
+        """Returns the parameters of a test (or template) deep-merged into
+        those of its "from_template", which may itself be derived from a
+        template. Blocks are merged key by key and arrays replaced, unless
+        "list_merge" is "append" or "by_index". Merged values are Parameters
+        that share their unchanged sub-trees with the template, except those
+        of copy_test and env_var_skip, which are plain values. Expanded
+        templates are kept in expanded_templates. Returns None on error."""
+        list_strategy = ListMergeStrategy.REPLACE
+        if "list_merge" in temp_dict:
+            try:
+                list_strategy = ListMergeStrategy[str(temp_dict["list_merge"]).upper()]
+            except KeyError:
+                print(f"\033[31mWARNING: Error test \"{test_name}\": " +
+                      f'illegal list_merge "{temp_dict["list_merge"]}".\033[0m')
+                return None
+
+        # Init the test's parameters dictionary
+        test_dict = {}
+
+        # Set to a template if needed
+        if "from_template" in temp_dict:
+            template_name = temp_dict["from_template"]
+            if not template_name in templates:
+                print(f"\033[31mWARNING: Error test \"{test_name}\": " +
+                f'template name "{template_name} not found."\033[0m')
+                return None
+            if template_name in chain or template_name == test_name:
+                print(f"\033[31mWARNING: Error test \"{test_name}\": " +
+                      f'template "{template_name}" is derived from itself.\033[0m')
+                return None
+            if not template_name in expanded_templates:
+                expanded_templates[template_name] = \
+                    self._expandTemplates(template_name, templates[template_name],
+                                          templates, expanded_templates,
+                                          parameter_pool, chain + (test_name,))
+            if expanded_templates[template_name] is None:
+                return None
+            test_dict = expanded_templates[template_name].copy()
+
+        # Merge/overwrite other original parameters
+        mergeable = (dict,) if list_strategy == ListMergeStrategy.REPLACE \
+                    else (dict, list)
+        for param_name in temp_dict:
+            if param_name == "from_template": continue
+            if param_name == "list_merge": continue
+
+            value = temp_dict[param_name]
+            template_value = test_dict.get(param_name)
+            if isinstance(value, mergeable) and \
+               isinstance(template_value, mergeable + (Parameter,)):
+                value = ParameterMerge.merge(parameter_pool.intern(param_name, template_value),
+                                             parameter_pool.intern(param_name, value),
+                                             list_strategy)
+                # These are read as plain values by _parseTestFiles itself
+                if param_name == "copy_test" or param_name == "env_var_skip":
+                    value = value.getPythonValue()
+            test_dict[param_name] = value
+
+        return test_dict
+
+
+    def historyName(self, test: TFCTestObject) -> str:
+        """Returns the name under which a test is kept in the history."""
+        return os.path.relpath(test.name_, self.directory_)
+
+    def _applyShard(self):
+        """Restricts the tests to the requested shard. Tests connected through
+        dependencies form groups that are never split. The groups are assigned,
+        longest first, to the least loaded shard, where the load is the
+        historical duration (or the median duration for tests without history).
+        The partitioning is deterministic, given the same tests and history,
+        which is why shard runs do not update the history."""
+        try:
+            shard_index, num_shards = [int(value) for value in self.shard_.split("/")]
+        except ValueError:
+            raise RuntimeError(f'\033[31mIllegal value "{self.shard_}" supplied '
+                               'for argument --shard, expected "i/N"\033[0m')
+        if not 1 <= shard_index <= num_shards:
+            raise RuntimeError(f'\033[31mIllegal value "{self.shard_}" supplied '
+                               'for argument --shard, i must be in [1,N]\033[0m')
+
+        tests = [test for test in self.tests_
+                 if test.weight_class_ in self.weight_classes_allowed_]
+
+        # Union-find of the dependency graph
+        parent = list(range(len(tests)))
+
+        def find(k: int) -> int:
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        tests_by_true_name: dict[str, list[int]] = {}
+        for k, test in enumerate(tests):
+            tests_by_true_name.setdefault(test.trueName(), []).append(k)
+
+        for k, test in enumerate(tests):
+            for dependency in test.dependencies_:
+                for j in tests_by_true_name.get(dependency.getStringValue(), []):
+                    parent[find(j)] = find(k)
+
+        groups: dict[int, list[TFCTestObject]] = {}
+        for k, test in enumerate(tests):
+            groups.setdefault(find(k), []).append(test)
+
+        # Weigh the groups
+        durations = {}
+        for test in tests:
+            durations[test] = self.history_.duration(self.historyName(test))
+        known = [duration for duration in durations.values() if duration is not None]
+        default_duration = statistics.median(known) if len(known) > 0 else 1.0
+
+        weighted_groups = []
+        for group in groups.values():
+            weight = 0.0
+            for test in group:
+                duration = durations[test]
+                weight += default_duration if duration is None else duration
+            key = min(self.historyName(test) for test in group)
+            weighted_groups.append((weight, key, group))
+        weighted_groups.sort(key=lambda item: (-item[0], item[1]))
+
+        # Greedy longest-processing-time-first assignment
+        loads = [0.0] * num_shards
+        selected = set()
+        for weight, key, group in weighted_groups:
+            target = min(range(num_shards), key=lambda i: (loads[i], i))
+            loads[target] += weight
+            if target == shard_index - 1:
+                selected.update(group)
+
+        self.tests_ = [test for test in self.tests_ if test in selected]
+
+        print(f"Shard {shard_index}/{num_shards}: {len(self.tests_)} of "
+              f"{len(tests)} tests, estimated {loads[shard_index - 1]:.1f}s")
+
+    def fingerprint(self, test: TFCTestObject) -> dict[str, str]:
+        """Returns the (cached) fingerprint of a test, see fingerprintTest."""
+        if test.fingerprint_ is None:
+            test.fingerprint_ = fingerprintTest(test, self, self.file_hasher_)
+        return test.fingerprint_
+
+    def _applyRerunFilter(self):
+        """Restricts the tests to those that failed in the last run, have no
+        recorded result, or whose fingerprint changed since it was recorded,
+        plus, transitively, the tests that depend on those."""
+        tests = [test for test in self.tests_
+                 if test.weight_class_ in self.weight_classes_allowed_]
+
+        reasons = dict(new=0, failed=0, changed=0, dependent=0)
+        selected = set()
+        for test in tests:
+            record = self.history_.get(self.historyName(test))
+            if record is None:
+                reasons["new"] += 1
+            elif not record.get("passed", False):
+                reasons["failed"] += 1
+            elif record.get("fingerprint") != self.fingerprint(test):
+                reasons["changed"] += 1
+            else:
+                continue
+            selected.add(test)
+
+        dependents: dict[str, list[TFCTestObject]] = {}
+        for test in tests:
+            for dependency in test.dependencies_:
+                dependents.setdefault(dependency.getStringValue(), []).append(test)
+
+        stack = list(selected)
+        while len(stack) > 0:
+            test = stack.pop()
+            for dependent in dependents.get(test.trueName(), []):
+                if dependent not in selected:
+                    reasons["dependent"] += 1
+                    selected.add(dependent)
+                    stack.append(dependent)
+
+        self.tests_ = [test for test in self.tests_ if test in selected]
+
+        print(f"Re-running {len(self.tests_)} of {len(tests)} tests: " +
+              ", ".join(f"{count} {reason}" for reason, count in reasons.items()))
+
+    def _submitFromCache(self, test: TFCTestObject) -> bool:
+        """Submits a test with its cached result, if the result cache has one.
+        Returns True if it did."""
+        if self.result_cache_ is None or test.skip_ != "":
+            return False
+
+        cached_result = self.result_cache_.lookup(
+            ResultCache.key(self.fingerprint(test)))
+        if cached_result is None:
+            return False
+
+        test.submitFromCache(self, cached_result)
+        return True
+
+    def _storeInCache(self, test: TFCTestObject) -> None:
+        """Stores the result of a test that passed after being executed."""
+        if not test.passed_ or test.cached_result_ is not None:
+            return
+        try:
+            with open(test.outFileName()) as out_file:
+                output = out_file.read()
+        except OSError:
+            return
+
+        self.result_cache_.store(ResultCache.key(self.fingerprint(test)),
+                                 dict(name=self.historyName(test),
+                                      output=output,
+                                      annotations=test.annotations_,
+                                      time=test.totalTime()))
+
+    def _updateProgress(self, progress: ProgressDisplay, num_done: int,
+                        load: int, capacity: int, default_duration: float) -> None:
+        """Counts the running and queued tests, estimates the remaining work
+        from historical durations and updates the progress display."""
+        now = time.perf_counter()
+        num_running = 0
+        num_queued = 0
+        remaining_work = 0.0
+        for test in self.tests_:
+            if test.ran_:
+                continue
+            expected = self.history_.duration(self.historyName(test), default_duration)
+            if expected is None:
+                remaining_work = None
+            if test.submitted_:
+                num_running += 1
+                if remaining_work is not None:
+                    remaining_work += max(0.0, expected - (now - test._time_start_)) * \
+                                      test.num_procs_
+            else:
+                num_queued += 1
+                if remaining_work is not None:
+                    remaining_work += expected * test.num_procs_
+
+        progress.update(num_done, num_running, num_queued, load, capacity,
+                        remaining_work)
+
+    def _releaseResources(self, test: TFCTestObject) -> None:
+        """Returns the CPUs/worker slots held by a test that is no longer
+        running."""
+        if len(test.trace_slots_) > 0:
+            self._traceSlots(test)
+        if len(test.cpus_) > 0:
+            self.core_allocator_.release(test.cpus_)
+            test.cpus_ = []
+        if test.worker_ is not None:
+            self.worker_pool_.release(test.worker_, test.num_procs_)
+            test.worker_ = None
+
+    def _traceSlots(self, test: TFCTestObject) -> None:
+        """Records the prerun script and process of a test on the slot tracks
+        it occupied, then frees them."""
+        _, testname_ = os.path.split(test.name_)
+        args = dict(test=test.name_, num_procs=test.num_procs_)
+        if test.prerun_script_ != "":
+            self.tracer_.slotEvents(f"prerun {testname_}", "script",
+                                    test._prerun_time_start_, test._prerun_time_end_,
+                                    test.trace_slots_, args)
+        if test._process_ is not None:
+            self.tracer_.slotEvents(testname_, "test", test._time_start_,
+                                    test._time_end_, test.trace_slots_,
+                                    dict(args, exit_code=test._process_.returncode))
+        self.tracer_.releaseSlots(test.trace_slots_)
+        test.trace_slots_ = []
+
+    @staticmethod
+    def _interrupt(signum, frame) -> None:
+        raise KeyboardInterrupt(signal.Signals(signum).name)
+
+    def _traceScheduler(self, name: str, start: float, test: TFCTestObject) -> None:
+        self.tracer_.complete(name, "scheduler", start, time.perf_counter(),
+                              TraceRecorder.SCHEDULER_TRACK, dict(test=test.name_))
+
     def run(self):
         """Actually executes the test system"""
 
@@ -273,50 +656,212 @@ class TFCTestSystem(TFCObject):
 
         job_state = {}
         capacity = self.num_jobs_
+        if len(self.worker_commands_) > 0:
+            self.worker_pool_ = TestWorkerPool(self.worker_commands_)
+            capacity = self.worker_pool_.numSlots()
+            print(f"Started {len(self.worker_pool_.workers_)} workers with "
+                  f"{capacity} slots in total")
         system_load = 0
         active_tests: list[TFCTestObject] = []
+        finished_tests: set[TFCTestObject] = set()
+        num_failures = 0
+        stop_submitting = False
+        num_tests_not_run = 0
+
+        progress = None
+        if self.progress_:
+            progress = ProgressDisplay(sys.stdout)
+            if progress.is_tty_:
+                sys.stdout = progress
+
+            known = [record["time"] for record in self.history_.records_.values()
+                     if "time" in record]
+            default_duration = statistics.median(known) if len(known) > 0 else None
+
+        if self.trace_file_ != "":
+            self.tracer_ = TraceRecorder(capacity)
+
+        reporters = []
+        if self.json_report_ != "":
+            reporters.append(JSONLinesReporter(self.json_report_))
+        if self.junit_report_ != "":
+            reporters.append(JUnitXMLReporter(self.junit_report_))
 
         # ======================================= Testing phase
+        # Post-completion work of tests (output writing, checks, postrun
+        # scripts) is executed by this pool so that it does not stall the
+        # submission of other tests.
+        self.executor_ = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.num_jobs_, thread_name_prefix="tfc_post")
+
+        # The tests run in sessions of their own, so they do not get the
+        # signals sent to the test system. Interrupting it raises
+        # KeyboardInterrupt and the running tests are killed below.
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for sig in [signal.SIGINT, signal.SIGTERM]:
+                previous_handlers[sig] = signal.signal(sig, self._interrupt)
+
         print("\nRunning tests " + self.weight_classes_allowed_.__str__() + "")
         k = 0
-        while True:
-            k += 1
+        try:
+            while True:
+                k += 1
 
-            done = True  # Assume we are done
-            for test in self.tests_:
-                if test.ran_ or (test.weight_class_ not in self.weight_classes_allowed_):
-                    test.ran_ = True
-                    continue
-                done = False
-
-                if not test.submitted_ and test.checkDependenciesMet(self.tests_):
-                    if test.num_procs_ <= (capacity - system_load):
-                        system_load += test.num_procs_
-
-                        test.submit(self)
+                done = True  # Assume we are done
+                for test in self.tests_:
+                    if test.ran_:
+                        continue
+                    if test.weight_class_ not in self.weight_classes_allowed_:
+                        test.ran_ = True
+                        test.filtered_ = True
+                        continue
+                    if stop_submitting and not test.submitted_:
+                        test.ran_ = True
+                        num_tests_not_run += 1
+                        continue
+                    done = False
+
+                    if not test.submitted_ and test.checkDependenciesMet(self.tests_):
+                        failed_dependency = test.failedDependency(self.tests_)
+                        if failed_dependency != "":
+                            test.skipForFailedDependency(failed_dependency)
+                            test.submit(self)
+                            active_tests.append(test)
+                            continue
 
-                        active_tests.append(test)
+                        if self._submitFromCache(test):
+                            active_tests.append(test)
+                            continue
 
-            # Check test progression
-            system_load = 0
+                        if test.num_procs_ <= (capacity - system_load):
+                            if self.worker_pool_ is not None and test.skip_ == "":
+                                worker = self.worker_pool_.reserve(test.num_procs_)
+                                if worker is None:
+                                    continue
+                                test.worker_ = worker
+                            elif self.core_allocator_ is not None and test.skip_ == "":
+                                # A test needing more CPUs than are available
+                                # gets all of them rather than never running
+                                num_cpus = min(test.num_procs_,
+                                               self.core_allocator_.numCPUs())
+                                cpus = self.core_allocator_.allocate(num_cpus)
+                                if cpus is None:
+                                    continue
+                                test.cpus_ = cpus
+
+                            system_load += test.num_procs_
+
+                            # Fingerprint the inputs as they are when the test starts
+                            self.fingerprint(test)
+                            submit_start = time.perf_counter()
+                            test.submit(self)
+                            if self.tracer_ is not None:
+                                test.trace_slots_ = self.tracer_.acquireSlots(
+                                    test.num_procs_)
+                                self._traceScheduler("submit", submit_start, test)
+
+                            active_tests.append(test)
+
+                # Check test progression
+                system_load = 0
+                for test in active_tests:
+                    try:
+                        progress_start = time.perf_counter()
+                        status = test.checkProgress(self)
+                        # Only the calls that change the state of a test do
+                        # noteworthy work; tracing every poll would swamp the trace
+                        if self.tracer_ is not None and \
+                           job_state.get(test) != status:
+                            job_state[test] = status
+                            self._traceScheduler(f"checkProgress -> {status}",
+                                                 progress_start, test)
+                        if status == "Running":
+                            system_load += test.num_procs_
+                        else:
+                            self._releaseResources(test)
+                    except Exception as ex:
+                        print(f"\033[31mERROR: Test {test.name_}"
+                              " had a Python failure\033[0m\n" + ex.__str__())
+                        raise ex
+
+                    if status == "Done" and test not in finished_tests:
+                        finished_tests.add(test)
+                        for reporter in reporters:
+                            reporter.testFinished(self, test)
+                        if not test.passed_ and not test.dependency_failed_:
+                            num_failures += 1
+
+                if self.max_failures_ > 0 and not stop_submitting and \
+                   num_failures >= self.max_failures_:
+                    stop_submitting = True
+                    print(f"\033[31mStopping after {num_failures} failed test(s)"
+                          "\033[0m")
+                    if self.cancel_running_:
+                        for test in active_tests:
+                            test.cancel()
+
+                if progress is not None and progress.due():
+                    self._updateProgress(progress, len(finished_tests),
+                                         system_load, capacity, default_duration)
+
+                time.sleep(0.01)
+
+                if done:
+                    break # from while-loop
+        finally:
             for test in active_tests:
-                try:
-                    if test.checkProgress(self) == "Running":
-                        system_load += test.num_procs_
-                except Exception as ex:
-                    print(f"\033[31mERROR: Test {test.name_}"
-                          " had a Python failure\033[0m\n" + ex.__str__())
-                    raise ex
-
-            time.sleep(0.01)
-
-            if done:
-                break # from while-loop
+                test.kill()
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            if progress is not None:
+                progress.close()
+                sys.stdout = progress.stream_
+            self.executor_.shutdown(wait=True, cancel_futures=True)
+            self.executor_ = None
+            if self.worker_pool_ is not None:
+                self.worker_pool_.close()
+                self.worker_pool_ = None
 
         # ======================================= Post-test phase
         end_time = time.perf_counter()
         elapsed_time = end_time - start_time
 
+        if self.tracer_ is not None:
+            self.tracer_.complete("run", "scheduler", start_time, end_time,
+                                  TraceRecorder.SCHEDULER_TRACK,
+                                  dict(num_tests=len(active_tests)))
+            self.tracer_.write(self.trace_file_)
+            print(f"Trace written to {self.trace_file_}")
+            self.tracer_ = None
+
+        for test in active_tests:
+            if test.skip_ != "":
+                continue
+            if test.cached_result_ is not None:
+                # Keep the recorded duration of the actual execution
+                self.history_.record(self.historyName(test),
+                                     passed=True,
+                                     fingerprint=self.fingerprint(test))
+                continue
+
+            self.history_.record(self.historyName(test),
+                                 time=test.totalTime(),
+                                 passed=test.passed_,
+                                 fingerprint=self.fingerprint(test))
+            if self.result_cache_ is not None:
+                self._storeInCache(test)
+        if self.shard_ == "":
+            self.history_.save()
+        else:
+            # The shards are partitioned from the history, so all the shards
+            # must see the same one, whatever order they are run in
+            print(f"History not updated in shard mode ({self.history_file_}), "
+                  "runs of all the tests update it")
+
+        for reporter in reporters:
+            reporter.finish(self, active_tests, elapsed_time)
+
         print("Done executing tests with class in: " +
           self.weight_classes_allowed_.__str__())
 
@@ -332,6 +877,12 @@ class TFCTestSystem(TFCObject):
         print("Elapsed time            : {:.2f} seconds".format(elapsed_time))
         print(f"Number of tests run     : {len(active_tests)}")
         print(f"Number of tests skipped : {num_tests_skipped}")
+        if stop_submitting:
+            print(f"Number of tests not run : {num_tests_not_run}")
+        if self.result_cache_ is not None:
+            num_tests_cached = sum(1 for test in active_tests
+                                   if test.cached_result_ is not None)
+            print(f"Number of tests cached  : {num_tests_cached}")
         if num_tests_failed == 0:
             print(f"Number of failed tests  : {num_tests_failed}")
         else:
@@ -344,6 +895,12 @@ class TFCTestSystem(TFCObject):
                 continue
 
             reason = f'{test.name_}:\n'
+            if test.timed_out_:
+                reason += f'Timed out after {test.effectiveTimeout(self)}s\n'
+            if test.cancelled_:
+                reason += 'Cancelled after reaching the maximum number of failures\n'
+            if test.dependency_failed_:
+                reason += f'Skipped because {test.skip_}\n'
             for check in test.checks_:
                 if check.failed_:
                     reason += f'{type(check)} {check.fail_reason_}'
@@ -0,0 +1,102 @@
+"""Content hashes describing what a test depends on"""
+from __future__ import annotations
+import os
+import shlex
+import shutil
+import hashlib
+
+
+class FileHasher:
+    """Computes file digests, caching them by path, size and modification time
+    so that files shared by many tests (e.g. the executable) are read once."""
+
+    def __init__(self) -> None:
+        self.cache_: dict[tuple, str] = {}
+
+    def digest(self, file_name: str) -> str:
+        """Returns the sha1 digest of a file, or "missing" if it does not
+        exist."""
+        try:
+            stat = os.stat(file_name)
+        except OSError:
+            return "missing"
+
+        key = (os.path.abspath(file_name), stat.st_size, stat.st_mtime_ns)
+        if key in self.cache_:
+            return self.cache_[key]
+
+        sha1 = hashlib.sha1()
+        with open(file_name, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                sha1.update(block)
+        self.cache_[key] = sha1.hexdigest()
+        return self.cache_[key]
+
+
+def hashString(value: str) -> str:
+    return hashlib.sha1(value.encode()).hexdigest()
+
+
+def resolveExecutable(program: str, cwd: str) -> str:
+    """Returns the path of the file a program name refers to, or None."""
+    if "/" in program:
+        path = program if os.path.isabs(program) else os.path.join(cwd, program)
+        return path if os.path.isfile(path) else None
+    return shutil.which(program)
+
+
+def referencedFiles(args: str, cwd: str) -> list[str]:
+    """Returns the existing files referenced by the words of an argument
+    string, relative to cwd. E.g. the input file of a test."""
+    try:
+        words = shlex.split(args)
+    except ValueError:
+        words = args.split()
+
+    files = []
+    for word in words:
+        candidates = [word]
+        # Also catch "--input=file" and "key=file" style arguments
+        if "=" in word:
+            candidates.append(word.split("=", 1)[1])
+        for candidate in candidates:
+            if candidate == "":
+                continue
+            path = candidate if os.path.isabs(candidate) else os.path.join(cwd, candidate)
+            if os.path.isfile(path):
+                files.append(path)
+    return sorted(set(files))
+
+
+def fingerprintTest(test, test_system, hasher: FileHasher) -> dict[str, str]:
+    """Returns the hashes of the things a test's result depends on:
+      spec       : the test's parameters (i.e. its YAML block after template
+                   expansion) and the resolved command line,
+      executable : the executable binary,
+      inputs     : files in the working directory referenced by the arguments,
+      gold       : files read by the checks (e.g. gold files)."""
+    work_dir = test.workDirectory()
+    command = test.buildCommand(test_system)
+
+    executable = test.executable_ if test.executable_ != "" else test_system.executable_
+    executable = test.keywordReplace(executable)
+    try:
+        words = shlex.split(executable)
+    except ValueError:
+        words = executable.split()
+    program = resolveExecutable(words[0], work_dir) if len(words) > 0 else None
+
+    inputs = ""
+    for file_name in referencedFiles(test.keywordReplace(test.args_), work_dir):
+        inputs += f"{file_name}:{hasher.digest(file_name)};"
+
+    gold = ""
+    for check in test.checks_:
+        for file_name in check.getInputFiles():
+            path = os.path.join(work_dir, file_name)
+            gold += f"{path}:{hasher.digest(path)};"
+
+    return dict(spec=hashString(test.spec_ + "\n" + command),
+                executable="missing" if program is None else hasher.digest(program),
+                inputs=hashString(inputs),
+                gold=hashString(gold))
@@ -0,0 +1,70 @@
+"""Definition of TestHistory"""
+from __future__ import annotations
+import os
+import json
+
+
+class TestHistory:
+    """Results of previous runs, stored as a JSON file mapping test names
+    (relative to the test directory) to a record of the last execution, e.g.
+    {"time": 1.2, "passed": true}. Saving merges the records of this run into
+    whatever is on disk, so that runs of different subsets of the tests (e.g.
+    by weight class) keep each other's records. Shard runs do not save it: the
+    shards must all be partitioned from the same history, which is built by
+    the runs of all the tests."""
+
+    def __init__(self, file_name: str) -> None:
+        self.file_name_ = file_name
+        self.records_: dict[str, dict] = self._read()
+        self.updated_: dict[str, dict] = {}
+
+    def _read(self) -> dict[str, dict]:
+        if not os.path.isfile(self.file_name_):
+            return {}
+        try:
+            with open(self.file_name_) as history_file:
+                records = json.load(history_file)
+        except (OSError, ValueError):
+            print(f'\033[31mWARNING: Ignoring unreadable test history '
+                  f'"{self.file_name_}"\033[0m')
+            return {}
+        return records if isinstance(records, dict) else {}
+
+    def get(self, name: str) -> dict:
+        """Returns the record of a test, or None if it has none."""
+        return self.records_.get(name)
+
+    def duration(self, name: str, default: float = None) -> float:
+        """Returns the last recorded duration of a test."""
+        record = self.records_.get(name)
+        if record is None or "time" not in record:
+            return default
+        return float(record["time"])
+
+    def record(self, name: str, **fields) -> None:
+        """Updates the record of a test."""
+        record = dict(self.records_.get(name, {}))
+        record.update(fields)
+        self.records_[name] = record
+        self.updated_[name] = record
+
+    def save(self) -> None:
+        """Merges the updated records into the file on disk. A history that
+        cannot be written (e.g. in a read-only checkout) is only warned
+        about."""
+        if len(self.updated_) == 0:
+            return
+
+        records = self._read()
+        records.update(self.updated_)
+
+        temp_file_name = f"{self.file_name_}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file_name, "w") as history_file:
+                json.dump(records, history_file, indent=1, sort_keys=True)
+            os.replace(temp_file_name, self.file_name_)
+        except OSError as error:
+            print(f'\033[31mWARNING: Could not save the test history '
+                  f'"{self.file_name_}": {error.strerror}\033[0m')
+            if os.path.isfile(temp_file_name):
+                os.remove(temp_file_name)
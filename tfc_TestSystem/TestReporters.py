@@ -0,0 +1,104 @@
+"""Machine-readable reporting of test results"""
+from __future__ import annotations
+import os
+import json
+import xml.etree.ElementTree as ET
+
+
+def testRecord(test_system, test) -> dict:
+    """Returns a JSON-serializable record of a finished test."""
+    failed_checks = []
+    for check in test.checks_:
+        if check.failed_:
+            failed_checks.append(dict(check=type(check).__name__,
+                                      name=check.name_,
+                                      reason=check.fail_reason_))
+
+    resources = None
+    if test.rusage_ is not None:
+        resources = dict(user_time=test.rusage_.ru_utime,
+                         system_time=test.rusage_.ru_stime,
+                         max_rss_kb=test.rusage_.ru_maxrss)
+
+    return dict(name=test_system.historyName(test),
+                status=test.status(),
+                passed=test.passed_,
+                time=test.totalTime(),
+                num_procs=test.num_procs_,
+                weight_class=test.weight_class_,
+                exit_code=test.error_code_,
+                annotations=test.annotations_,
+                skip_reason=test.skip_,
+                failed_checks=failed_checks,
+                resources=resources,
+                command=test._command_.strip())
+
+
+class JSONLinesReporter:
+    """Appends one JSON record per test to a file as soon as the test has
+    finished."""
+
+    def __init__(self, file_name: str) -> None:
+        self.file_ = open(file_name, "w")
+
+    def testFinished(self, test_system, test) -> None:
+        self.file_.write(json.dumps(testRecord(test_system, test)) + "\n")
+        self.file_.flush()
+
+    def finish(self, test_system, tests: list, elapsed_time: float) -> None:
+        self.file_.close()
+
+
+class JUnitXMLReporter:
+    """Writes a JUnit XML file, with one testsuite per test directory, once
+    all tests have finished."""
+
+    def __init__(self, file_name: str) -> None:
+        self.file_name_ = file_name
+
+    def testFinished(self, test_system, test) -> None:
+        pass
+
+    def finish(self, test_system, tests: list, elapsed_time: float) -> None:
+        suites: dict[str, list] = {}
+        for test in tests:
+            suite_name = os.path.dirname(test_system.historyName(test))
+            suites.setdefault(suite_name if suite_name != "" else ".", []).append(test)
+
+        root = ET.Element("testsuites", name=test_system.name_,
+                          time=f"{elapsed_time:.3f}")
+        for suite_name, suite_tests in suites.items():
+            suite = ET.SubElement(root, "testsuite", name=suite_name)
+            num_failures = 0
+            num_skipped = 0
+            suite_time = 0.0
+            for test in suite_tests:
+                record = testRecord(test_system, test)
+                suite_time += record["time"]
+
+                case = ET.SubElement(suite, "testcase",
+                                     classname=suite_name,
+                                     name=test.trueName(),
+                                     time=f"{record['time']:.3f}")
+                if record["status"] == "skipped":
+                    num_skipped += 1
+                    ET.SubElement(case, "skipped", message=test.skip_)
+                elif not test.passed_:
+                    num_failures += 1
+                    reasons = [f"{check['check']} {check['reason']}"
+                               for check in record["failed_checks"]]
+                    message = record["status"]
+                    if test.dependency_failed_:
+                        message = test.skip_
+                    failure = ET.SubElement(case, "failure", message=message,
+                                            type=record["status"])
+                    failure.text = "\n".join(reasons)
+
+            suite.set("tests", str(len(suite_tests)))
+            suite.set("failures", str(num_failures))
+            suite.set("errors", "0")
+            suite.set("skipped", str(num_skipped))
+            suite.set("time", f"{suite_time:.3f}")
+
+        ET.ElementTree(root).write(self.file_name_, encoding="utf-8",
+                                   xml_declaration=True)
@@ -13,9 +13,12 @@ sys.path.append(file_path + "../")
 from tfc_PyFactory import *
 from tfc_TestSystem import *
 import tfc_TestSystem
+import TestWorker
 
 # ---------------------------------------------------------
 #                    Link custom source here
+# Installed packages can instead advertise their checks under the
+# "tfc_pyfactory.objects" entry-point group; these are loaded on demand.
 # sys.path.append(file_path + "../RELAP_custom_src")
 # from RELAP_checks import *
 # ---------------------------------------------------------
@@ -30,8 +33,8 @@ parser = argparse.ArgumentParser(
 )
 
 parser.add_argument(
-    "-d", "--directory", default=None, type=str, required=True,
-    help="The test directory to inspect recursively"
+    "-d", "--directory", default=None, type=str, required=False,
+    help="The test directory to inspect recursively (required unless --worker)"
 )
 parser.add_argument(
     "-e", "--executable", default="python3", type=str, required=False,
@@ -59,8 +62,129 @@ parser.add_argument(
     help="The name of the default config file"
 )
 
+parser.add_argument(
+    "--bind_cores", default=False, action="store_true",
+    help="Bind each running test to its own set of CPUs (NUMA-aware)"
+)
+
+parser.add_argument(
+    "--worker", default=False, action="store_true",
+    help="Run as a worker that executes test commands for a coordinator "
+         "over stdin/stdout, with -j job slots"
+)
+parser.add_argument(
+    "--local_workers", default=0, type=int, required=False,
+    help="Start this many local workers, sharing the -j job slots, and "
+         "execute the test commands on them"
+)
+parser.add_argument(
+    "--worker_cmds", default=[], type=str, nargs="+", required=False,
+    help="Shell commands that each start a worker, e.g. "
+         "\"ssh node1 python3 /path/TestSystemEXE.py --worker -j 16\""
+)
+
+parser.add_argument(
+    "--shard", default="", type=str, required=False,
+    help="Only run shard i of N (1-based), e.g. --shard 2/4. Runners of the "
+         "other shards must see the same tests and test history, which shard "
+         "runs do not update."
+)
+
+parser.add_argument(
+    "--history_file", default="", type=str, required=False,
+    help="The file in which the results and durations of previous runs are "
+         "kept (default: .tfc_test_history.json in the test directory)"
+)
+
+parser.add_argument(
+    "--rerun", default=False, action="store_true",
+    help="Only run tests that failed last time, are new, or whose spec, "
+         "inputs, gold files or executable changed, plus their dependents"
+)
+
+parser.add_argument(
+    "--cache_dir", default="", type=str, required=False,
+    help="Directory of a result cache. Tests whose fingerprint (spec, command, "
+         "executable, inputs, gold files) matches a cached passed result are "
+         "not executed"
+)
+
+parser.add_argument(
+    "--max_failures", "--max-failures", default=0, type=int, required=False,
+    help="Stop starting new tests once this many tests have failed"
+)
+parser.add_argument(
+    "--fail_fast", "--fail-fast", default=False, action="store_true",
+    help="Same as --max_failures 1"
+)
+parser.add_argument(
+    "--cancel_running", default=False, action="store_true",
+    help="Kill running tests once the maximum number of failures is reached"
+)
+
+parser.add_argument(
+    "--json_report", default="", type=str, required=False,
+    help="Stream one JSON record per finished test to this file"
+)
+parser.add_argument(
+    "--junit_report", default="", type=str, required=False,
+    help="Write a JUnit XML report to this file"
+)
+
+parser.add_argument(
+    "--progress", default=None, action="store_true",
+    help="Show the progress/ETA status even if stdout is not a terminal, "
+         "where it is printed periodically"
+)
+parser.add_argument(
+    "--no_progress", dest="progress", action="store_false",
+    help="Do not show the live progress/ETA status (the default if stdout is "
+         "not a terminal)"
+)
+
+parser.add_argument(
+    "--trace_file", default="", type=str, required=False,
+    help="Write a Chrome/Perfetto trace of the scheduler and job slots to this file"
+)
+parser.add_argument(
+    "--profile_objects", default=None, type=str, required=False, nargs="?",
+    const="", metavar="PROF_FILE",
+    help="Print the time spent constructing objects, per type, during startup. "
+         "If a file is given, cProfile statistics are also written to it"
+)
+
+parser.add_argument(
+    "--list_types", default=None, type=str, required=False, nargs="*",
+    metavar="TYPE",
+    help="List the registered object types (including plugins) and their "
+         "parameters, or only those of the given types, then exit"
+)
+
 argv = parser.parse_args()  # argv = argument values
 
+if argv.list_types is not None:
+    type_names = argv.list_types if len(argv.list_types) > 0 \
+                 else PyFactory.registeredTypes()
+    for type_name in type_names:
+        try:
+            print(PyFactory.describeType(type_name) + "\n")
+        except RuntimeError as error:
+            print(f"\033[31mERROR: {error}\033[0m")
+            exit(1)
+    exit(0)
+
+if argv.worker:
+    exit(TestWorker.runWorker(argv.num_jobs))
+
+if argv.directory is None:
+    parser.error("the following arguments are required: -d/--directory")
+
+worker_commands = list(argv.worker_cmds)
+for k in range(0, argv.local_workers):
+    slots = max(1, argv.num_jobs // argv.local_workers)
+    worker_commands.append(f'"{sys.executable}" "{file_path}TestSystemEXE.py" '
+                           f'--worker -j {slots}')
+
 params: dict = {}
 params["type"] = "TFCTestSystem"
 params["directory"] = argv.directory
@@ -68,8 +192,36 @@ params["executable"] = argv.executable
 params["num_jobs"] = argv.num_jobs
 params["weights"] = argv.weights
 params["config_file"] = argv.config_file
+params["bind_cores"] = argv.bind_cores
+params["worker_commands"] = worker_commands
+params["shard"] = argv.shard
+params["history_file"] = argv.history_file
+params["rerun"] = argv.rerun
+params["cache_dir"] = argv.cache_dir
+params["max_failures"] = 1 if argv.fail_fast else argv.max_failures
+params["cancel_running"] = argv.cancel_running
+params["json_report"] = argv.json_report
+params["junit_report"] = argv.junit_report
+if argv.progress is not None:
+    params["progress"] = argv.progress
+params["trace_file"] = argv.trace_file
+
+if argv.profile_objects is not None:
+    PyFactory.enableProfiling(use_cprofile=(argv.profile_objects != ""))
 
 test_system = PyFactory.makeObject("TFCTestSystem", Parameter("", params))
-error_code = test_system.run()
+
+if argv.profile_objects is not None:
+    PyFactory.disableProfiling()
+    print("\nObject construction profile:")
+    print(PyFactory.profileReport())
+    if argv.profile_objects != "":
+        PyFactory.dumpProfile(argv.profile_objects)
+        print(f"cProfile statistics written to {argv.profile_objects}")
+try:
+    error_code = test_system.run()
+except KeyboardInterrupt as interrupt:
+    print(f"\033[31mInterrupted ({str(interrupt) or 'SIGINT'}), running tests killed\033[0m")
+    error_code = 130
 
 exit(error_code)
@@ -0,0 +1,244 @@
+"""Coordinator/worker protocol for executing test commands on other processes
+or hosts.
+
+A worker is started with `TestSystemEXE.py --worker -j <slots>`, locally or
+remotely (e.g. via ssh), and talks to the coordinator with JSON lines over its
+stdin/stdout. The coordinator sends
+
+  {"op": "run", "id": 7, "args": ["exe", "arg"], "cwd": "/path"}
+  {"op": "signal", "id": 7, "signal": 15}
+  {"op": "exit"}
+
+and the worker answers with
+
+  {"op": "hello", "slots": 4, "host": "node12"}
+  {"op": "done", "id": 7, "returncode": 0, "stdout": "...", "stderr": "...",
+   "time": 1.2}
+
+Workers only execute commands; checks and postrun scripts are processed by
+the coordinator, hence test directories must live on a shared file system."""
+from __future__ import annotations
+import sys
+import os
+import json
+import socket
+import subprocess
+import threading
+import time
+
+
+# ===================================================================
+def runWorker(num_slots: int) -> int:
+    """Main loop of a worker process. Returns the exit code."""
+    # The protocol owns stdout, anything printed goes to stderr
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    send_lock = threading.Lock()
+
+    def send(message: dict):
+        with send_lock:
+            protocol_out.write(json.dumps(message) + "\n")
+            protocol_out.flush()
+
+    processes: dict[int, subprocess.Popen] = {}
+
+    send(dict(op="hello", slots=num_slots, host=socket.gethostname()))
+
+    for line in sys.stdin:
+        if line.strip() == "":
+            continue
+        message = json.loads(line)
+
+        if message["op"] == "run":
+            thread = threading.Thread(target=_runJob,
+                                      args=(message, processes, send),
+                                      daemon=True)
+            thread.start()
+        elif message["op"] == "signal":
+            process = processes.get(message["id"])
+            if process is not None:
+                try:
+                    os.killpg(process.pid, message["signal"])
+                except ProcessLookupError:
+                    pass
+        elif message["op"] == "exit":
+            break
+
+    for process in list(processes.values()):
+        try:
+            os.killpg(process.pid, 9)
+        except ProcessLookupError:
+            pass
+
+    return 0
+
+
+def _runJob(message: dict, processes: dict, send) -> None:
+    """Executes a single command on behalf of the coordinator."""
+    job_id = message["id"]
+    time_start = time.perf_counter()
+    try:
+        process = subprocess.Popen(message["args"],
+                                   cwd=message["cwd"],
+                                   start_new_session=True,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   universal_newlines=True)
+    except OSError as ex:
+        send(dict(op="done", id=job_id, returncode=127, stdout="",
+                  stderr=str(ex), time=time.perf_counter() - time_start))
+        return
+
+    processes[job_id] = process
+    out, err = process.communicate()
+    del processes[job_id]
+
+    send(dict(op="done", id=job_id, returncode=process.returncode,
+              stdout=out, stderr=err, time=time.perf_counter() - time_start))
+
+
+# ===================================================================
+class RemoteProcess:
+    """Handle to a command executing on a worker. Mimics the parts of
+    subprocess.Popen used by the test system."""
+
+    def __init__(self, worker: TestWorker, job_id: int) -> None:
+        self.worker_ = worker
+        self.id_ = job_id
+        self.pid = None
+        self.returncode = None
+        self.stdout_ = ""
+        self.stderr_ = ""
+        self.time_ = 0.0
+        self._done_ = threading.Event()
+
+    def poll(self):
+        return self.returncode if self._done_.is_set() else None
+
+    def communicate(self, timeout: float = None) -> tuple[str, str]:
+        if not self._done_.wait(timeout):
+            raise subprocess.TimeoutExpired(str(self.id_), timeout)
+        return self.stdout_, self.stderr_
+
+    def killGroup(self, sig: int) -> None:
+        """Signals the command's process group on the worker."""
+        if not self._done_.is_set():
+            self.worker_.send(dict(op="signal", id=self.id_, signal=int(sig)))
+
+    def _complete(self, message: dict) -> None:
+        self.stdout_ = message["stdout"]
+        self.stderr_ = message["stderr"]
+        self.time_ = message["time"]
+        self.returncode = message["returncode"]
+        self._done_.set()
+
+
+# ===================================================================
+class TestWorker:
+    """Coordinator-side connection to a single worker process."""
+
+    def __init__(self, command: str) -> None:
+        self.command_ = command
+        self._process_ = subprocess.Popen(command,
+                                          shell=True,
+                                          stdin=subprocess.PIPE,
+                                          stdout=subprocess.PIPE,
+                                          universal_newlines=True,
+                                          bufsize=1)
+        self._send_lock_ = threading.Lock()
+        self._jobs_: dict[int, RemoteProcess] = {}
+
+        hello = self._readMessage()
+        if hello is None or hello["op"] != "hello":
+            raise RuntimeError(f'Worker "{command}" failed to start')
+
+        self.slots_: int = hello["slots"]
+        self.host_: str = hello["host"]
+        self.load_: int = 0
+
+        self._reader_ = threading.Thread(target=self._readLoop, daemon=True)
+        self._reader_.start()
+
+    def _readMessage(self) -> dict:
+        line = self._process_.stdout.readline()
+        if line == "":
+            return None
+        return json.loads(line)
+
+    def _readLoop(self) -> None:
+        while True:
+            message = self._readMessage()
+            if message is None:
+                break
+            if message["op"] == "done":
+                job = self._jobs_.pop(message["id"])
+                job._complete(message)
+
+        # The worker died, fail whatever it was still running
+        for job in list(self._jobs_.values()):
+            job._complete(dict(returncode=-1, stdout="",
+                               stderr=f'Worker "{self.command_}" terminated',
+                               time=0.0))
+        self._jobs_.clear()
+
+    def send(self, message: dict) -> None:
+        with self._send_lock_:
+            self._process_.stdin.write(json.dumps(message) + "\n")
+            self._process_.stdin.flush()
+
+    def launch(self, job_id: int, args: list[str], cwd: str) -> RemoteProcess:
+        job = RemoteProcess(self, job_id)
+        self._jobs_[job_id] = job
+        self.send(dict(op="run", id=job_id, args=args, cwd=os.path.abspath(cwd)))
+        return job
+
+    def close(self) -> None:
+        try:
+            self.send(dict(op="exit"))
+            self._process_.stdin.close()
+        except (BrokenPipeError, ValueError):
+            pass
+        self._process_.wait()
+
+
+# ===================================================================
+class TestWorkerPool:
+    """The set of workers of a coordinator. Job slots are reserved on a
+    single worker per test, analogous to the CPU allocation of CoreAllocator."""
+
+    def __init__(self, worker_commands: list[str]) -> None:
+        self.workers_: list[TestWorker] = []
+        for command in worker_commands:
+            self.workers_.append(TestWorker(command))
+        self._next_id_ = 0
+
+    def numSlots(self) -> int:
+        return sum(worker.slots_ for worker in self.workers_)
+
+    def reserve(self, num_procs: int) -> TestWorker:
+        """Reserves slots on the least loaded worker that can hold num_procs
+        (or all of a worker's slots, for tests larger than any worker).
+        Returns None if no worker currently can."""
+        best = None
+        for worker in self.workers_:
+            needed = min(num_procs, worker.slots_)
+            if worker.slots_ - worker.load_ < needed:
+                continue
+            if best is None or worker.load_ < best.load_:
+                best = worker
+
+        if best is not None:
+            best.load_ += min(num_procs, best.slots_)
+        return best
+
+    def release(self, worker: TestWorker, num_procs: int) -> None:
+        worker.load_ -= min(num_procs, worker.slots_)
+
+    def launch(self, worker: TestWorker, args: list[str], cwd: str) -> RemoteProcess:
+        self._next_id_ += 1
+        return worker.launch(self._next_id_, args, cwd)
+
+    def close(self) -> None:
+        for worker in self.workers_:
+            worker.close()
@@ -0,0 +1,87 @@
+"""Definition of TraceRecorder"""
+from __future__ import annotations
+import json
+import threading
+import time
+
+
+class TraceRecorder:
+    """Collects timed events of a test run and writes them in the Chrome
+    trace-event format (loadable in chrome://tracing and Perfetto).
+
+    Events are placed on tracks: the scheduler, one track per job slot and
+    one per thread doing post-processing. Times are perf_counter values."""
+
+    SCHEDULER_TRACK = 0
+    SLOT_TRACK_OFFSET = 1000
+
+    def __init__(self, num_slots: int) -> None:
+        self.start_time_ = time.perf_counter()
+        self.events_: list[dict] = []
+        self.lock_ = threading.Lock()
+        self.track_names_: dict[int, str] = {self.SCHEDULER_TRACK: "scheduler"}
+        self.thread_tracks_: dict[int, int] = {}
+        self.free_slots_ = list(range(num_slots))
+
+    def _timestamp(self, perf_time: float) -> float:
+        """Microseconds since the recorder was created."""
+        return (perf_time - self.start_time_) * 1.0e6
+
+    def threadTrack(self) -> int:
+        """Returns the track of the calling thread."""
+        ident = threading.get_ident()
+        with self.lock_:
+            if ident not in self.thread_tracks_:
+                track = len(self.thread_tracks_) + 1
+                self.thread_tracks_[ident] = track
+                self.track_names_[track] = threading.current_thread().name
+            return self.thread_tracks_[ident]
+
+    def acquireSlots(self, num_slots: int) -> list[int]:
+        """Assigns the lowest free slot tracks to a test."""
+        with self.lock_:
+            self.free_slots_.sort()
+            slots = self.free_slots_[:num_slots]
+            del self.free_slots_[:num_slots]
+            for slot in slots:
+                self.track_names_[self.SLOT_TRACK_OFFSET + slot] = f"slot {slot}"
+            return slots
+
+    def releaseSlots(self, slots: list[int]) -> None:
+        with self.lock_:
+            self.free_slots_ += slots
+
+    def complete(self, name: str, category: str, start: float, end: float,
+                 track: int = None, args: dict = None) -> None:
+        """Records an event that lasted from start to end. If no track is
+        given the event goes on the calling thread's track."""
+        if track is None:
+            track = self.threadTrack()
+        event = dict(name=name, cat=category, ph="X", pid=1, tid=track,
+                     ts=self._timestamp(start),
+                     dur=max(0.0, (end - start) * 1.0e6))
+        if args is not None:
+            event["args"] = args
+        with self.lock_:
+            self.events_.append(event)
+
+    def slotEvents(self, name: str, category: str, start: float, end: float,
+                   slots: list[int], args: dict = None) -> None:
+        """Records an event on each of the slot tracks occupied by a test."""
+        for slot in slots:
+            self.complete(name, category, start, end,
+                          self.SLOT_TRACK_OFFSET + slot, args)
+
+    def write(self, file_name: str) -> None:
+        events = [dict(name="process_name", ph="M", pid=1,
+                       args=dict(name="TFCTestSystem"))]
+        for track, track_name in self.track_names_.items():
+            events.append(dict(name="thread_name", ph="M", pid=1, tid=track,
+                               args=dict(name=track_name)))
+            events.append(dict(name="thread_sort_index", ph="M", pid=1, tid=track,
+                               args=dict(sort_index=track)))
+        with self.lock_:
+            events += self.events_
+
+        with open(file_name, "w") as trace_file:
+            json.dump(dict(traceEvents=events, displayTimeUnit="ms"), trace_file)
@@ -1,6 +1,6 @@
 from .TFCTestSystem import *
 from .TFCTestObject import *
-from .checks import *
+from . import checks
 
 __all__ = ["TFCTestSystem",
            "TFCTestObject"]
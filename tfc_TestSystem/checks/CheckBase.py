@@ -38,3 +38,9 @@ class CheckBase(TFCObject):
         indicate that the check failed to execute, not the reason for it's
         failure."""
         return True
+
+    def getInputFiles(self) -> list[str]:
+        """Returns the files, relative to the test's working directory, that
+        the check reads as inputs (e.g. gold files). A test whose check inputs
+        change is considered affected by the change."""
+        return []
@@ -35,6 +35,9 @@ class TextFileDiffCheck(CheckBase):
         self.check_file_ = params.getParam("check_file").getStringValue()
         self.inverse_ = params.getParam("inverse").getBooleanValue()
 
+    def getInputFiles(self) -> list[str]:
+        return [self.gold_file_]
+
     def executeCheck(self, config: dict, annotations: list[str]) -> bool:
         dir_ = config["work_directory"]
 
@@ -61,6 +61,7 @@ class WordStringCheck(CheckBase):
             return False
 
         lines = out_file.readlines()
+        out_file.close()
         relevant_line = None
         relevant_line_num = -1
 
@@ -113,13 +114,10 @@ class WordStringCheck(CheckBase):
             message = f'Line {relevant_line_num}, word ' + \
                 f'{self.word_number_} ("{relevant_word}"), failed gold value ' + \
                 f'evalutaion: "{relevant_word}" != "{self.gold_value_}".'
-            print(message)
             self.failed_ = True
             self.fail_reason_ = message
-            out_file.close()
             return False
         else:
-            out_file.close()
             return True
 
 
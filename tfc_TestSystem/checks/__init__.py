@@ -1,11 +1,10 @@
-from .ExitCodeCheck import *
-from .CheckBase import *
-from .WordIntegerCheck import *
-from .WordFloatCheck import *
-from .WordStringCheck import *
-from .HasStringCheck import *
-from .TextFileDiffCheck import *
+import importlib
 
+from tfc_PyFactory import PyFactory
+
+# The check modules are not imported here. Each check type is registered by
+# its path and its module is only imported when the first check of that type
+# is made, or when the class is accessed as an attribute of this package.
 __all__ = ['ExitCodeCheck',
            'CheckBase',
            'WordIntegerCheck',
@@ -13,3 +12,14 @@ __all__ = ['ExitCodeCheck',
            'WordStringCheck',
            'HasStringCheck',
            'TextFileDiffCheck']
+
+for _check_name in __all__:
+    if _check_name != 'CheckBase':
+        PyFactory.registerLazy(_check_name, f"{__name__}.{_check_name}:{_check_name}")
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        module = importlib.import_module(f"{__name__}.{name}")
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")